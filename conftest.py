@@ -0,0 +1,46 @@
+"""
+Shared pytest fixtures for the SGM simulator test suite
+"""
+
+import gc
+
+import pytest
+
+from sgm_simulator import ReservedVolumesConfig, SGMRule, SGMState
+
+
+@pytest.fixture(scope="session")
+def default_rule():
+    """The canonical 20%/week or $20/week test rule (treat as read-only)"""
+    return SGMRule(
+        name="Test Rule",
+        growth_percentage=20.0,
+        min_growth_dollars=20.0,
+        enabled=True,
+    )
+
+
+@pytest.fixture(scope="session")
+def default_reserved():
+    """$100 of reserved volume on a 30-day cycle starting day 1 (read-only)"""
+    return ReservedVolumesConfig(
+        monthly_volume=100.0, billing_day_start=1, days_in_cycle=30
+    )
+
+
+@pytest.fixture
+def fresh_state(default_rule):
+    """An SGMState at day 0 (empty wallet and history) under the default rule"""
+    return SGMState(default_rule)
+
+
+@pytest.fixture
+def no_gc():
+    """Keep the cyclic garbage collector paused while a long day loop runs"""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
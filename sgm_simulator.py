@@ -15,13 +15,21 @@ in the main content area for better user experience.
 """
 
 import argparse
+import array
 import json
 import math
+import os
 import sys
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timedelta
+from enum import IntEnum
+from functools import lru_cache
+from itertools import islice
 from typing import Dict, List, NamedTuple, Optional, Tuple
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
 try:
     import plotly.express as px
     import plotly.graph_objects as go
@@ -30,12 +38,35 @@ try:
 except ImportError:
     PLOTLY_AVAILABLE = False
 
+# Lean Plotly client config: no mode bar, and double-click resets the view
+_PLOTLY_CONFIG = {"displayModeBar": False, "responsive": True, "doubleClick": "reset"}
+
+# Kernels are JIT-compiled at import only with SGM_USE_NUMBA=1 and numba installed
+# (the optional "fast" extra); otherwise, e.g. in CI, they run as plain Python
+NUMBA_AVAILABLE = False
+if os.environ.get("SGM_USE_NUMBA", "0") == "1":
+    try:
+        from numba import njit
+
+        NUMBA_AVAILABLE = True
+    except ImportError:
+        pass
+
+if not NUMBA_AVAILABLE:
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernels run as plain Python without Numba"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
 # =============================================================================
 # CORE DOMAIN MODELS
 # =============================================================================
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SGMRule:
     """SGM Rule configuration"""
 
@@ -47,6 +78,8 @@ class SGMRule:
     weekly_recalc_enabled: bool = False
     weekly_recalc_day: int = 0  # 0=Monday, 6=Sunday
     validate_bounds: bool = True  # Allow disabling validation for tests
+    # Derived once per rule: PRFAQ daily growth factor (1 + growth%)^(1/7)
+    daily_growth_factor: float = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """Validate SGM rule parameters per PRD requirements"""
@@ -66,6 +99,13 @@ class SGMRule:
                 f"Weekly recalculation day must be 0-6 (Monday-Sunday), got {self.weekly_recalc_day}"
             )
 
+        # Frozen dataclass: set the derived field through object.__setattr__
+        object.__setattr__(
+            self,
+            "daily_growth_factor",
+            (1 + self.growth_percentage / 100) ** (1.0 / 7),
+        )
+
 
 @dataclass
 class ManualAllowance:
@@ -86,6 +126,40 @@ class ManualAllowance:
         """Get remaining allowance amount (0 if expired)"""
         return 0.0 if self.is_expired(current_day) else self.amount
 
+    @classmethod
+    def batch(cls, allowances: List["ManualAllowance"]) -> np.ndarray:
+        """
+        Pack allowances into one contiguous record array (ALLOWANCE_DTYPE)
+        with -1 as the expiration of allowances that never expire
+        """
+        return np.fromiter(
+            (
+                (
+                    a.amount,
+                    a.created_day,
+                    -1 if a.expiration_days is None else a.expiration_days,
+                )
+                for a in allowances
+            ),
+            ALLOWANCE_DTYPE,
+            len(allowances),
+        )
+
+    @staticmethod
+    def to_arrays(
+        allowances: List["ManualAllowance"],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convert allowances into parallel arrays for vectorized expiry checks
+        Returns: (amounts, created_days, expiration_days) with -1 for never expires
+        """
+        records = ManualAllowance.batch(allowances)
+        return records["amount"], records["created"], records["exp"]
+
+
+# Record layout used by ManualAllowance.batch
+ALLOWANCE_DTYPE = np.dtype([("amount", "f8"), ("created", "i8"), ("exp", "i8")])
+
 
 @dataclass
 class WalletConfig:
@@ -94,16 +168,20 @@ class WalletConfig:
     model: str = "daily_limit_2x"  # "daily_limit_2x" or "three_day_budget"
     custom_multiplier: Optional[float] = None  # For custom models
 
-    def calculate_max_capacity(self, daily_limit: float) -> float:
-        """Calculate maximum wallet capacity based on model"""
+    def capacity_multiplier(self) -> float:
+        """Multiple of the daily limit the wallet may hold under this model"""
         if self.model == "daily_limit_2x":
-            return daily_limit * 2.0
+            return 2.0
         elif self.model == "three_day_budget":
-            return daily_limit * 3.0
+            return 3.0
         elif self.model == "custom" and self.custom_multiplier:
-            return daily_limit * self.custom_multiplier
+            return self.custom_multiplier
         else:
-            return daily_limit * 2.0  # Default fallback
+            return 2.0  # Default fallback
+
+    def calculate_max_capacity(self, daily_limit: float) -> float:
+        """Calculate maximum wallet capacity based on model (works on arrays too)"""
+        return daily_limit * self.capacity_multiplier()
 
 
 @dataclass
@@ -124,7 +202,7 @@ class Invoice:
         return self.total_amount
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ReservedVolumesConfig:
     """Reserved volumes configuration"""
 
@@ -137,8 +215,31 @@ class ReservedVolumesConfig:
         next_day = current_day + 1
         return 1 if next_day > self.days_in_cycle else next_day
 
+    def billing_days(self, num_days: int) -> np.ndarray:
+        """Billing day of days 0..num_days-1, starting at billing_day_start"""
+        # advance_billing_day wraps a start past the cycle end straight to 1
+        offset = self.billing_day_start
+        if offset > self.days_in_cycle:
+            offset = 0
+        billing_days = (offset + np.arange(num_days) - 1) % self.days_in_cycle + 1
+        billing_days[:1] = self.billing_day_start
+        return billing_days
 
-@dataclass
+
+class InterventionType(IntEnum):
+    """Integer codes for the DayResult intervention_type labels"""
+
+    NONE = 0
+    THROTTLE = 1
+    SHUTDOWN = 2
+
+    @property
+    def label(self) -> str:
+        """The DayResult intervention_type string for this code"""
+        return self.name.lower()
+
+
+@dataclass(slots=True)
 class DayResult:
     """Result of simulating a single day"""
 
@@ -160,6 +261,322 @@ class DayResult:
     expired_allowances: float = 0.0  # New: Track expired allowances
 
 
+def day_results_to_arrays(days: List[DayResult]) -> Dict[str, np.ndarray]:
+    """Convert a list of DayResults into one NumPy column per field"""
+    return {
+        f.name: np.array([getattr(d, f.name) for d in days]) for f in fields(DayResult)
+    }
+
+
+# =============================================================================
+# NUMERIC KERNELS
+# =============================================================================
+
+# Kernels carry explicit signatures so Numba compiles them eagerly at import
+# (and caches the machine code) instead of on the first call
+
+# Intervention labels indexed by the integer codes the kernels return
+_INTERVENTION_LABELS = tuple(t.label for t in InterventionType)
+_INTERVENTION_CODES = {t.label: t for t in InterventionType}
+
+
+@njit("float64(int64, float64, float64, float64)", cache=True)
+def _bootstrap_limit(days_elapsed, total_so_far, growth_percentage, min_growth_dollars):
+    """Daily limit during the first week (fewer than 7 days of history)"""
+    if days_elapsed == 0:
+        # Day 0: Allow minimum weekly amount divided by 7
+        return min_growth_dollars / 7
+
+    # How much do we need per day to reach weekly minimum?
+    needed_per_day = (min_growth_dollars - total_so_far) / (7 - days_elapsed)
+
+    # Also calculate growth based on current average
+    current_avg = total_so_far / days_elapsed
+    growth_based = current_avg * (1 + growth_percentage / 100)
+
+    return max(needed_per_day, growth_based, min_growth_dollars / 7)
+
+
+@njit("float64(float64, float64, float64, float64)", cache=True)
+def _prfaq_limit(recent_7, recent_6, daily_growth_factor, min_growth_dollars):
+    """
+    Daily limit from the PRFAQ rolling-window sums
+    (daily_growth_factor is SGMRule.daily_growth_factor)
+    """
+    exponential_limit = recent_7 * daily_growth_factor - recent_6
+    linear_limit = recent_7 + min_growth_dollars / 7 - recent_6
+
+    return max(exponential_limit, linear_limit, 0.0)
+
+
+@njit(
+    "Tuple((float64, float64, float64, float64, int64))"
+    "(float64, float64, float64, float64, float64)",
+    cache=True,
+)
+def _settle_sgm_spend(
+    remaining_spend, daily_limit, wallet_balance, max_wallet_capacity, active_allowances
+):
+    """
+    Spend the non-reserved request against the wallet and manual allowances
+    Returns: (wallet_start, sgm_spend, sgm_from_manual, wallet_end, intervention_code)
+    """
+    # CRITICAL FIX: Ensure wallet never exceeds capacity at any point
+    wallet_start = min(wallet_balance, max_wallet_capacity)
+
+    # Calculate base SGM capacity (subject to wallet cap)
+    base_sgm_capacity = min(wallet_start + daily_limit, max_wallet_capacity)
+
+    # Add manual allowances on top (not subject to wallet cap)
+    wallet_available = base_sgm_capacity + active_allowances
+
+    sgm_spend = min(remaining_spend, wallet_available)
+
+    # Calculate how much was spent from wallet vs manual allowances
+    sgm_from_wallet = min(sgm_spend, base_sgm_capacity)
+    sgm_from_manual = sgm_spend - sgm_from_wallet
+
+    # Update wallet balance (only affected by wallet spending, not manual allowance spending)
+    wallet_end = base_sgm_capacity - sgm_from_wallet
+
+    # Determine intervention based on SGM rejection only (not reserved)
+    intervention_code = 0
+    if remaining_spend > 0 and sgm_spend < remaining_spend:
+        sgm_rejection_rate = (remaining_spend - sgm_spend) / remaining_spend
+        if sgm_rejection_rate >= 0.9:  # 90% or more of SGM request rejected
+            intervention_code = 2
+        elif sgm_rejection_rate > 0:
+            intervention_code = 1
+
+    return wallet_start, sgm_spend, sgm_from_manual, wallet_end, intervention_code
+
+
+def _settle_sgm_spend_batch(
+    remaining_spend, daily_limit, wallet_balance, max_wallet_capacity, active_allowances
+):
+    """
+    _settle_sgm_spend over arrays (scalars broadcast), one entry per day
+    Returns: (wallet_start, sgm_spend, sgm_from_manual, wallet_end, intervention_codes)
+    """
+    wallet_start = np.minimum(wallet_balance, max_wallet_capacity)
+    base_sgm_capacity = np.minimum(wallet_start + daily_limit, max_wallet_capacity)
+    sgm_spend = np.minimum(remaining_spend, base_sgm_capacity + active_allowances)
+    sgm_from_wallet = np.minimum(sgm_spend, base_sgm_capacity)
+    wallet_end = base_sgm_capacity - sgm_from_wallet
+
+    sgm_rejection_rate = np.divide(
+        remaining_spend - sgm_spend,
+        remaining_spend,
+        out=np.zeros(np.shape(sgm_spend)),
+        where=remaining_spend > 0,
+    )
+    intervention_codes = np.select(
+        [sgm_rejection_rate >= 0.9, sgm_rejection_rate > 0], [2, 1], 0
+    )
+    return (
+        wallet_start,
+        sgm_spend,
+        sgm_spend - sgm_from_wallet,
+        wallet_end,
+        intervention_codes,
+    )
+
+
+def _daily_limits_batch(history_len, recent_7, recent_6, rule, baseline_spend=None):
+    """
+    _daily_limit over arrays of window sums that share one history length
+    (baseline_spend is None or an array, and only used with weekly recalculation)
+    Returns: daily limits
+    """
+    min_daily = rule.min_growth_dollars / 7
+    if history_len == 0:
+        return np.full(np.shape(recent_7), min_daily)
+
+    if history_len < 7:
+        # Bootstrap period, as in _bootstrap_limit
+        needed_per_day = (rule.min_growth_dollars - recent_7) / (7 - history_len)
+        growth_based = recent_7 / history_len * (1 + rule.growth_percentage / 100)
+        return np.maximum(np.maximum(needed_per_day, growth_based), min_daily)
+
+    if baseline_spend is not None and rule.weekly_recalc_enabled:
+        # Growth on the recalculated baseline, as in _daily_limit
+        weekly_baseline = baseline_spend * 7.0
+        return (
+            np.maximum(
+                rule.min_growth_dollars,
+                weekly_baseline * (1 + rule.growth_percentage / 100),
+            )
+            / 7.0
+        )
+
+    # PRFAQ rolling-window algorithm, as in _prfaq_limit
+    exponential_limit = recent_7 * rule.daily_growth_factor - recent_6
+    linear_limit = recent_7 + min_daily - recent_6
+    return np.maximum(np.maximum(exponential_limit, linear_limit), 0.0)
+
+
+@njit("UniTuple(float64, 2)(float64, float64, float64)", cache=True)
+def _neumaier_add(total, compensation, value):
+    """
+    Add value to a running total with Neumaier (improved Kahan-Babuska)
+    compensation; total + compensation is the accurately rounded sum
+    Returns: (total, compensation)
+    """
+    new_total = total + value
+    if abs(total) >= abs(value):
+        compensation += (total - new_total) + value
+    else:
+        compensation += (value - new_total) + total
+    return new_total, compensation
+
+
+def _neumaier_add_batch(total, compensation, value):
+    """
+    _neumaier_add over arrays, one running total per entry
+    Returns: (total, compensation)
+    """
+    new_total = total + value
+    compensation = compensation + np.where(
+        np.abs(total) >= np.abs(value),
+        (total - new_total) + value,
+        (value - new_total) + total,
+    )
+    return new_total, compensation
+
+
+@njit(
+    "void(float64[:], float64[:], boolean[:], float64, float64, float64, float64,"
+    " float64, float64[:], float64[:], float64[:], float64[:], float64[:],"
+    " float64[:], float64[:], float64[:], float64[:], float64[:], float64[:],"
+    " int8[:], float64[:])",
+    cache=True,
+)
+def _simulate_days_kernel(
+    requests,
+    daily_allowances,
+    cycle_resets,
+    growth_percentage,
+    daily_growth_factor,
+    min_growth_dollars,
+    capacity_multiplier,
+    reserved_volume,
+    accepted,
+    rejected,
+    reserved_spend,
+    sgm_spend,
+    daily_limit,
+    wallet_start,
+    wallet_end,
+    wallet_capacity,
+    reserved_remaining,
+    cumulative_reserved_used,
+    manual_used,
+    intervention_codes,
+    history_cumsum,
+):
+    """
+    Whole-run day loop for rules without weekly recalculation or expiring
+    manual allowances (reserved_volume is 0 without a reserved config)
+    Fills the output arrays in place, as BatchedSimulator.run does per day
+    """
+    wallet_balance = 0.0
+    cumulative = 0.0
+    running_total = 0.0
+    compensation = 0.0
+
+    for day in range(len(requests)):
+        requested = requests[day]
+
+        # Step 1: Reserved volumes, reset at the start of each billing cycle
+        if cycle_resets[day]:
+            cumulative = 0.0
+        reserved = 0.0
+        if reserved_volume > 0:
+            reserved = min(requested, max(0.0, reserved_volume - cumulative))
+            cumulative += reserved
+
+        # Step 2: Limit from the trailing 7/6-day windows of accepted spend
+        total = history_cumsum[day]
+        recent_7 = total - history_cumsum[max(day - 7, 0)]
+        recent_6 = total - history_cumsum[max(day - 6, 0)]
+        if day < 7:
+            limit = _bootstrap_limit(
+                day, recent_7, growth_percentage, min_growth_dollars
+            )
+        else:
+            limit = _prfaq_limit(
+                recent_7, recent_6, daily_growth_factor, min_growth_dollars
+            )
+
+        # Steps 3-4: Wallet capacity and settlement
+        capacity = limit * capacity_multiplier
+        start, sgm, from_manual, end, code = _settle_sgm_spend(
+            requested - reserved,
+            limit,
+            wallet_balance,
+            capacity,
+            max(0.0, daily_allowances[day]),
+        )
+
+        # Step 5: Totals
+        total_accepted = reserved + sgm
+        accepted[day] = total_accepted
+        rejected[day] = requested - total_accepted
+        reserved_spend[day] = reserved
+        sgm_spend[day] = sgm
+        daily_limit[day] = limit
+        wallet_start[day] = start
+        wallet_end[day] = end
+        wallet_capacity[day] = capacity
+        reserved_remaining[day] = max(0.0, reserved_volume - cumulative)
+        cumulative_reserved_used[day] = cumulative
+        manual_used[day] = from_manual
+        intervention_codes[day] = code
+
+        running_total, compensation = _neumaier_add(
+            running_total, compensation, total_accepted
+        )
+        history_cumsum[day + 1] = running_total + compensation
+        wallet_balance = end
+
+
+@lru_cache(maxsize=4096)
+def _daily_limit(
+    history_len: int,
+    recent_7: float,
+    recent_6: float,
+    growth_percentage: float,
+    daily_growth_factor: float,
+    min_growth_dollars: float,
+    baseline_spend: Optional[float],
+) -> float:
+    """
+    Daily limit from scalar window sums and rule settings (history_len capped
+    at 7, baseline_spend None unless weekly recalculation is enabled)
+    Memoized so repeated windows under equal rules skip the arithmetic
+    """
+    if history_len < 7:
+        # Bootstrap period: take the maximum of what we need to reach the
+        # weekly minimum, growth on the current average, and the daily minimum
+        return _bootstrap_limit(
+            history_len, recent_7, growth_percentage, min_growth_dollars
+        )
+
+    # PRFAQ algorithm for 7+ days of history
+    # Use baseline if weekly recalculation is enabled and we have a baseline
+    if baseline_spend is not None:
+        # Use baseline for growth calculations (PRD-style)
+        weekly_baseline = baseline_spend * 7.0
+        weekly_growth_limit = max(
+            min_growth_dollars,
+            weekly_baseline * (1 + growth_percentage / 100),
+        )
+        return weekly_growth_limit / 7.0
+
+    # Standard PRFAQ rolling-window algorithm
+    return _prfaq_limit(recent_7, recent_6, daily_growth_factor, min_growth_dollars)
+
+
 # =============================================================================
 # STATELESS SIMULATION ENGINE
 # =============================================================================
@@ -180,66 +597,107 @@ class SGMEngine:
         Calculate daily spend limit with weekly recalculation support
         Returns: (daily_limit, last_recalc_day, baseline_spend)
         """
+        if not accepted_history:
+            # Day 0 of bootstrap: no window to sum and no recalculation to do
+            return rule.min_growth_dollars / 7, last_recalc_day, baseline_spend
+
+        return SGMEngine._limit_from_window_sums(
+            len(accepted_history),
+            float(sum(accepted_history[-7:])),
+            float(sum(accepted_history[-6:])),
+            rule,
+            current_day_index,
+            last_recalc_day,
+            baseline_spend,
+        )
+
+    @staticmethod
+    def _limit_from_window_sums(
+        history_len: int,
+        recent_7: float,
+        recent_6: float,
+        rule: SGMRule,
+        current_day_index: int = 0,
+        last_recalc_day: int = 0,
+        baseline_spend: Optional[float] = None,
+    ) -> Tuple[float, int, Optional[float]]:
+        """
+        calculate_daily_spend_limit from the sums of the last 7 and 6 days
+        (during bootstrap recent_7 is the whole history)
+        Returns: (daily_limit, last_recalc_day, baseline_spend)
+        """
+        if not rule.weekly_recalc_enabled:
+            # Fast path for the default rule: no recalculation state to update
+            daily_limit = _daily_limit(
+                min(history_len, 7),
+                recent_7,
+                recent_6,
+                rule.growth_percentage,
+                rule.daily_growth_factor,
+                rule.min_growth_dollars,
+                None,
+            )
+            return daily_limit, last_recalc_day, baseline_spend
+
         # Check if we need weekly recalculation
-        should_recalc = False
-        if rule.weekly_recalc_enabled and len(accepted_history) >= 7:
+        if history_len >= 7:
             days_since_recalc = current_day_index - last_recalc_day
             current_weekday = current_day_index % 7
             if days_since_recalc >= 7 and current_weekday == rule.weekly_recalc_day:
-                should_recalc = True
                 last_recalc_day = current_day_index
 
                 # WEEKLY RECALCULATION: Calculate new baseline from recent 7-day average
-                baseline_spend = sum(accepted_history[-7:]) / 7.0
-        if len(accepted_history) < 7:
-            # Bootstrap period - use a more reasonable approach
-            if len(accepted_history) == 0:
-                # Day 0: Allow minimum weekly amount divided by 7
-                daily_limit = rule.min_growth_dollars / 7
-                return daily_limit, last_recalc_day, baseline_spend
-
-            # Days 1-6: Allow growth based on actual history
-            # Calculate what we need to reach weekly minimum
-            days_elapsed = len(accepted_history)
-            total_so_far = sum(accepted_history)
-            days_remaining = 7 - days_elapsed
-
-            # How much do we need per day to reach weekly minimum?
-            needed_per_day = (rule.min_growth_dollars - total_so_far) / days_remaining
-
-            # Also calculate growth based on current average
-            current_avg = total_so_far / days_elapsed
-            growth_based = current_avg * (1 + rule.growth_percentage / 100)
-
-            # Take the maximum of:
-            # 1. What we need to reach weekly minimum
-            # 2. Growth based on current average
-            # 3. Daily minimum allowance
-            daily_limit = max(needed_per_day, growth_based, rule.min_growth_dollars / 7)
-            return daily_limit, last_recalc_day, baseline_spend
-
-        # PRFAQ algorithm for 7+ days of history
-        # Use baseline if weekly recalculation is enabled and we have a baseline
-        if rule.weekly_recalc_enabled and baseline_spend is not None:
-            # Use baseline for growth calculations (PRD-style)
-            weekly_baseline = baseline_spend * 7.0
-            weekly_growth_limit = max(
-                rule.min_growth_dollars,
-                weekly_baseline * (1 + rule.growth_percentage / 100),
-            )
-            daily_limit = weekly_growth_limit / 7.0
-        else:
-            # Standard PRFAQ rolling-window algorithm
-            recent_7 = sum(accepted_history[-7:])
-            recent_6 = sum(accepted_history[-6:])
+                baseline_spend = recent_7 / 7.0
+
+        daily_limit = _daily_limit(
+            min(history_len, 7),
+            recent_7,
+            recent_6,
+            rule.growth_percentage,
+            rule.daily_growth_factor,
+            rule.min_growth_dollars,
+            baseline_spend,
+        )
+        return daily_limit, last_recalc_day, baseline_spend
 
-            growth_factor = (1 + rule.growth_percentage / 100) ** (1.0 / 7)
-            exponential_limit = recent_7 * growth_factor - recent_6
-            linear_limit = recent_7 + rule.min_growth_dollars / 7 - recent_6
+    @staticmethod
+    def calculate_rolling_limits(
+        accepted_history: List[float], rule: SGMRule, days
+    ) -> np.ndarray:
+        """
+        Daily limits for each day in days, each computed like
+        calculate_daily_spend_limit(accepted_history[:day], rule, day, 0)
+        Returns: one limit per requested day
+        """
+        # Seven leading zeros so every day, including bootstrap days, has a
+        # full trailing window; window i then covers accepted_history[i-7:i]
+        padded = np.concatenate((np.zeros(7), np.asarray(accepted_history, float)))
+        sums_7 = sliding_window_view(padded, 7).sum(axis=1)
+        sums_6 = sliding_window_view(padded[1:], 6).sum(axis=1)
+
+        return np.array(
+            [
+                SGMEngine._limit_from_window_sums(
+                    day, float(sums_7[day]), float(sums_6[day]), rule, day, 0
+                )[0]
+                for day in days
+            ]
+        )
 
-            daily_limit = max(exponential_limit, linear_limit, 0)
+    @staticmethod
+    def recalc_schedule(rule: SGMRule, num_days: int) -> np.ndarray:
+        """
+        Days on which weekly recalculation fires for a run starting at day 0
+        (last_recalc_day=0, history growing one entry per day)
+        Returns: boolean array, one entry per day
+        """
+        if not rule.weekly_recalc_enabled:
+            return np.zeros(num_days, dtype=bool)
 
-        return daily_limit, last_recalc_day, baseline_spend
+        days = np.arange(num_days)
+        # Matching weekdays are exactly 7 days apart, so after day 7 every one
+        # of them is at least a week past the previous recalculation
+        return (days % 7 == rule.weekly_recalc_day) & (days >= 7)
 
     @staticmethod
     def calculate_active_manual_allowances(
@@ -249,16 +707,42 @@ class SGMEngine:
         Calculate total active and expired manual allowances
         Returns: (active_total, expired_total)
         """
-        active_total = 0.0
-        expired_total = 0.0
+        return SGMEngine._allowance_totals(
+            *ManualAllowance.to_arrays(allowances), current_day
+        )
 
-        for allowance in allowances:
-            if allowance.is_expired(current_day):
-                expired_total += allowance.amount
-            else:
-                active_total += allowance.remaining_amount(current_day)
+    @staticmethod
+    def calculate_manual_allowance_schedule(
+        allowances: List[ManualAllowance], num_days: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Active and expired manual allowance totals for days 0..num_days-1
+        Returns: (active_totals, expired_totals), one entry per day
+        """
+        amounts, created_days, expiration_days = ManualAllowance.to_arrays(allowances)
+        days = np.arange(num_days)[:, None]
+
+        # days x allowances grid of expiry flags
+        expired = (expiration_days[None, :] >= 0) & (
+            days >= created_days[None, :] + expiration_days[None, :]
+        )
+        return (~expired) @ amounts, expired @ amounts
 
-        return active_total, expired_total
+    @staticmethod
+    def _allowance_totals(
+        amounts: np.ndarray,
+        created_days: np.ndarray,
+        expiration_days: np.ndarray,
+        current_day: int,
+    ) -> Tuple[float, float]:
+        """
+        calculate_active_manual_allowances over ManualAllowance.to_arrays output
+        Returns: (active_total, expired_total)
+        """
+        expired = (expiration_days >= 0) & (
+            current_day >= created_days + expiration_days
+        )
+        return float(amounts[~expired].sum()), float(amounts[expired].sum())
 
     @staticmethod
     def simulate_day(
@@ -278,6 +762,7 @@ class SGMEngine:
     ) -> Tuple[DayResult, int, Optional[float]]:
         """
         Simulate a single day with enhanced wallet cap enforcement
+        accepted_history is treated as read-only; callers may pass their live list
         Returns: (DayResult, updated_last_recalc_day, updated_baseline_spend)
         """
         if wallet_config is None:
@@ -295,6 +780,54 @@ class SGMEngine:
             )
             manual_allowances = manual_allowances + [legacy_allowance]
 
+        values, updated_last_recalc_day, updated_baseline = (
+            SGMEngine._simulate_day_values(
+                day_index,
+                billing_day,
+                requested_spend,
+                wallet_balance,
+                len(accepted_history),
+                float(sum(accepted_history[-7:])),
+                float(sum(accepted_history[-6:])),
+                rule,
+                wallet_config.capacity_multiplier(),
+                reserved_config,
+                cumulative_reserved_used,
+                ManualAllowance.to_arrays(manual_allowances),
+                last_recalc_day,
+                baseline_spend,
+            )
+        )
+        return DayResult(*values), updated_last_recalc_day, updated_baseline
+
+    @staticmethod
+    def _simulate_day_values(
+        day_index: int,
+        billing_day: int,
+        requested_spend: float,
+        wallet_balance: float,
+        history_len: int,
+        recent_7: float,
+        recent_6: float,
+        rule: SGMRule,
+        capacity_multiplier: float = 2.0,
+        reserved_config: Optional[ReservedVolumesConfig] = None,
+        cumulative_reserved_used: float = 0,
+        allowance_arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+        last_recalc_day: int = 0,
+        baseline_spend: Optional[float] = None,
+        same_day_allowance: float = 0.0,
+    ) -> Tuple[tuple, int, Optional[float]]:
+        """
+        Core of simulate_day without building a DayResult, taking the history
+        as its length plus the sums of the last 7 and 6 days, the wallet model
+        as its capacity multiplier, and the manual allowances as
+        ManualAllowance.to_arrays output plus a never-expiring same-day amount
+        Returns: (values in DayResult field order, last_recalc_day, baseline_spend)
+        """
+        if allowance_arrays is None:
+            allowance_arrays = ManualAllowance.to_arrays([])
+
         # Step 1: Handle reserved volumes first
         reserved_spend = 0.0
         new_cumulative_reserved = cumulative_reserved_used
@@ -319,54 +852,47 @@ class SGMEngine:
 
         # Step 2: Calculate SGM limits with weekly recalculation
         daily_limit, updated_last_recalc_day, updated_baseline = (
-            SGMEngine.calculate_daily_spend_limit(
-                accepted_history, rule, day_index, last_recalc_day, baseline_spend
+            SGMEngine._limit_from_window_sums(
+                history_len,
+                recent_7,
+                recent_6,
+                rule,
+                day_index,
+                last_recalc_day,
+                baseline_spend,
             )
         )
 
         # Step 3: Calculate wallet capacity and enforce strict cap
-        max_wallet_capacity = wallet_config.calculate_max_capacity(daily_limit)
-
-        # CRITICAL FIX: Ensure wallet never exceeds capacity at any point
-        wallet_start = min(wallet_balance, max_wallet_capacity)
+        max_wallet_capacity = daily_limit * capacity_multiplier
 
         # Calculate manual allowances (active vs expired)
-        active_allowances, expired_allowances = (
-            SGMEngine.calculate_active_manual_allowances(manual_allowances, day_index)
+        active_allowances, expired_allowances = SGMEngine._allowance_totals(
+            *allowance_arrays, day_index
         )
+        # Like the legacy manual_allowance of simulate_day, only positive amounts apply
+        active_allowances += max(0.0, same_day_allowance)
 
-        # Calculate base SGM capacity (subject to wallet cap)
-        base_sgm_capacity = min(wallet_start + daily_limit, max_wallet_capacity)
-
-        # Add manual allowances on top (not subject to wallet cap)
-        wallet_available = base_sgm_capacity + active_allowances
-
-        # Step 4: Handle remaining spend through SGM
-        sgm_spend = min(remaining_spend, wallet_available)
-
-        # Calculate how much was spent from wallet vs manual allowances
-        sgm_from_wallet = min(sgm_spend, base_sgm_capacity)
-        sgm_from_manual = sgm_spend - sgm_from_wallet
-
-        # Update wallet balance (only affected by wallet spending, not manual allowance spending)
-        wallet_end = base_sgm_capacity - sgm_from_wallet
-
+        # Step 4: Handle remaining spend through SGM, capping the wallet at capacity
         # Per PRD: Manual allowances do not accumulate or carry over between days
+        (
+            wallet_start,
+            sgm_spend,
+            manual_allowances_used,
+            wallet_end,
+            intervention_code,
+        ) = _settle_sgm_spend(
+            remaining_spend,
+            daily_limit,
+            float(wallet_balance),
+            max_wallet_capacity,
+            active_allowances,
+        )
 
         # Step 5: Calculate totals and intervention
         total_accepted = reserved_spend + sgm_spend
         total_rejected = requested_spend - total_accepted
-        manual_allowances_used = sgm_from_manual
-
-        # Determine intervention based on SGM rejection only (not reserved)
-        intervention = "none"
-        if remaining_spend > 0 and sgm_spend < remaining_spend:
-            # Only count SGM rejections for intervention logic
-            sgm_rejection_rate = (remaining_spend - sgm_spend) / remaining_spend
-            if sgm_rejection_rate >= 0.9:  # 90% or more of SGM request rejected
-                intervention = "shutdown"
-            elif sgm_rejection_rate > 0:
-                intervention = "throttle"
+        intervention = _INTERVENTION_LABELS[intervention_code]
 
         # Calculate remaining reserved volume
         if reserved_config:
@@ -374,26 +900,536 @@ class SGMEngine:
                 0, reserved_config.monthly_volume - new_cumulative_reserved
             )
 
-        result = DayResult(
-            day_index=day_index,
+        values = (
+            day_index,
+            billing_day,
+            requested_spend,
+            total_accepted,
+            total_rejected,
+            reserved_spend,
+            sgm_spend,
+            daily_limit,
+            wallet_start,
+            wallet_end,
+            max_wallet_capacity,
+            intervention,
+            reserved_remaining,
+            new_cumulative_reserved,
+            manual_allowances_used,
+            expired_allowances,
+        )
+
+        return values, updated_last_recalc_day, updated_baseline
+
+    @staticmethod
+    def simulate_day_scenarios(
+        day_index: int,
+        billing_day: int,
+        requested_spend,
+        wallet_balance,
+        accepted_history: List[float],
+        rule: SGMRule,
+        wallet_config: Optional[WalletConfig] = None,
+        reserved_config: Optional[ReservedVolumesConfig] = None,
+        cumulative_reserved_used: float = 0,
+        manual_allowances: Optional[List[List[ManualAllowance]]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Simulate one day for several independent scenarios sharing a history
+        requested_spend and wallet_balance broadcast across scenarios, and
+        manual_allowances holds one allowance list per scenario
+        Returns: one array per DayResult field, one entry per scenario
+        """
+        requested, wallet = np.broadcast_arrays(
+            np.asarray(requested_spend, dtype=np.float64),
+            np.asarray(wallet_balance, dtype=np.float64),
+        )
+        columns = SGMEngine.simulate_days_batch(
+            requested[:, None],
+            rule,
+            wallet_config,
+            reserved_config,
+            manual_allowances=manual_allowances,
+            start_day=day_index,
             billing_day=billing_day,
-            requested_spend=requested_spend,
-            accepted_spend=total_accepted,
-            rejected_spend=total_rejected,
-            reserved_spend=reserved_spend,
-            sgm_spend=sgm_spend,
-            daily_spend_limit=daily_limit,
-            wallet_balance_start=wallet_start,
-            wallet_balance_end=wallet_end,
-            wallet_max_capacity=max_wallet_capacity,
-            intervention_type=intervention,
-            reserved_remaining=reserved_remaining,
-            cumulative_reserved_used=new_cumulative_reserved,
-            manual_allowances_used=manual_allowances_used,
-            expired_allowances=expired_allowances,
+            wallet_balance=wallet,
+            accepted_history=accepted_history,
+            cumulative_reserved_used=cumulative_reserved_used,
+        )
+        return {name: column[:, 0] for name, column in columns.items()}
+
+    @staticmethod
+    def simulate_days_batch(
+        requested_spend,
+        rule: SGMRule,
+        wallet_config: Optional[WalletConfig] = None,
+        reserved_config: Optional[ReservedVolumesConfig] = None,
+        manual_allowances=None,
+        daily_allowances=None,
+        start_day: int = 0,
+        billing_day=None,
+        wallet_balance=0.0,
+        accepted_history: Optional[List[float]] = None,
+        cumulative_reserved_used=0.0,
+        last_recalc_day: int = 0,
+        baseline_spend: Optional[float] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Simulate consecutive days from start_day for one scenario (1-D
+        requested_spend) or for several independent scenarios (2-D, one row
+        each), every day matching simulate_day fed the previous day's results
+        Scenarios share accepted_history and the recalculation state, while
+        wallet_balance and cumulative_reserved_used broadcast across them;
+        billing_day is the billing day of each day (scalars broadcast, None
+        follows the reserved config from day 0 or stays at 1), daily_allowances
+        holds legacy same-day amounts, and manual_allowances is an allowance
+        list, or one list per scenario for 2-D requests
+        Window sums are differences of compensated prefix sums, as in
+        BatchedSimulator, so a single scenario from day 0 matches simulate_range
+        Returns: one array per DayResult field, shaped like requested_spend
+        """
+        if wallet_config is None:
+            wallet_config = WalletConfig()
+        if accepted_history is None:
+            accepted_history = []
+        requests = np.asarray(requested_spend, dtype=np.float64)
+        shape = requests.shape
+        requests = np.atleast_2d(requests)
+        num_scenarios, num_days = requests.shape
+
+        days = start_day + np.arange(num_days)
+        if billing_day is not None:
+            billing_days = np.broadcast_to(
+                np.asarray(billing_day, dtype=np.int64), (num_days,)
+            )
+        elif reserved_config:
+            billing_days = reserved_config.billing_days(start_day + num_days)[
+                start_day:
+            ]
+        else:
+            billing_days = np.ones(num_days, dtype=np.int64)
+
+        # Manual allowance totals per scenario and day; only positive legacy
+        # same-day amounts apply, as in simulate_day
+        active_allowances = np.zeros(requests.shape)
+        expired_allowances = np.zeros(requests.shape)
+        if manual_allowances:
+            if len(shape) < 2:
+                manual_allowances = [manual_allowances]
+            for row, allowances in enumerate(manual_allowances):
+                if allowances:
+                    active, expired = SGMEngine.calculate_manual_allowance_schedule(
+                        allowances, start_day + num_days
+                    )
+                    active_allowances[row] = active[start_day:]
+                    expired_allowances[row] = expired[start_day:]
+        if daily_allowances is not None:
+            active_allowances += np.maximum(
+                np.asarray(daily_allowances, dtype=np.float64), 0.0
+            )
+
+        # Compensated prefix sums of the shared history, then one row per
+        # scenario for the simulated days
+        history_len = len(accepted_history)
+        history_cumsum = np.zeros((num_scenarios, history_len + num_days + 1))
+        running_total = 0.0
+        compensation = 0.0
+        for i, accepted in enumerate(accepted_history):
+            running_total, compensation = _neumaier_add(
+                running_total, compensation, float(accepted)
+            )
+            history_cumsum[:, i + 1] = running_total + compensation
+        running_total = np.full(num_scenarios, running_total)
+        compensation = np.full(num_scenarios, compensation)
+
+        wallet = np.broadcast_to(
+            np.asarray(wallet_balance, dtype=np.float64), (num_scenarios,)
+        )
+        cumulative = np.broadcast_to(
+            np.asarray(cumulative_reserved_used, dtype=np.float64), (num_scenarios,)
+        )
+        baseline = (
+            None if baseline_spend is None else np.full(num_scenarios, baseline_spend)
+        )
+        capacity_multiplier = wallet_config.capacity_multiplier()
+        monthly_volume = reserved_config.monthly_volume if reserved_config else 0.0
+
+        columns = {
+            f.name: np.empty(requests.shape)
+            for f in fields(DayResult)
+            if f.name not in ("day_index", "billing_day", "intervention_type")
+        }
+        intervention_codes = np.empty(requests.shape, dtype=np.int8)
+
+        # Each day depends on the previous one, so step through the days with
+        # every scenario advanced at once
+        for step, day_index in enumerate(days.tolist()):
+            requested = requests[:, step]
+            history_days = history_len + step
+
+            # Step 1: Reserved volumes, resetting usage on each new billing cycle
+            reserved_spend = np.zeros(num_scenarios)
+            if monthly_volume > 0:
+                if billing_days[step] == 1 and day_index > 0:
+                    cumulative = np.zeros(num_scenarios)
+                reserved_available = np.maximum(0, monthly_volume - cumulative)
+                reserved_spend = np.minimum(requested, reserved_available)
+                cumulative = cumulative + reserved_spend
+
+            # Step 2: Limits from the trailing windows, with weekly recalculation
+            total = history_cumsum[:, history_days]
+            recent_7 = total - history_cumsum[:, max(history_days - 7, 0)]
+            recent_6 = total - history_cumsum[:, max(history_days - 6, 0)]
+            if (
+                rule.weekly_recalc_enabled
+                and history_days >= 7
+                and day_index - last_recalc_day >= 7
+                and day_index % 7 == rule.weekly_recalc_day
+            ):
+                last_recalc_day = day_index
+                baseline = recent_7 / 7.0
+            daily_limit = _daily_limits_batch(
+                history_days, recent_7, recent_6, rule, baseline
+            )
+
+            # Steps 3-4: Wallet capacity and settlement
+            max_wallet_capacity = daily_limit * capacity_multiplier
+            wallet_start, sgm_spend, manual_used, wallet_end, codes = (
+                _settle_sgm_spend_batch(
+                    requested - reserved_spend,
+                    daily_limit,
+                    wallet,
+                    max_wallet_capacity,
+                    active_allowances[:, step],
+                )
+            )
+
+            # Step 5: Totals
+            total_accepted = reserved_spend + sgm_spend
+            columns["requested_spend"][:, step] = requested
+            columns["accepted_spend"][:, step] = total_accepted
+            columns["rejected_spend"][:, step] = requested - total_accepted
+            columns["reserved_spend"][:, step] = reserved_spend
+            columns["sgm_spend"][:, step] = sgm_spend
+            columns["daily_spend_limit"][:, step] = daily_limit
+            columns["wallet_balance_start"][:, step] = wallet_start
+            columns["wallet_balance_end"][:, step] = wallet_end
+            columns["wallet_max_capacity"][:, step] = max_wallet_capacity
+            columns["reserved_remaining"][:, step] = (
+                np.maximum(0, monthly_volume - cumulative) if reserved_config else 0.0
+            )
+            columns["cumulative_reserved_used"][:, step] = cumulative
+            columns["manual_allowances_used"][:, step] = manual_used
+            intervention_codes[:, step] = codes
+
+            running_total, compensation = _neumaier_add_batch(
+                running_total, compensation, total_accepted
+            )
+            history_cumsum[:, history_days + 1] = running_total + compensation
+            wallet = wallet_end
+
+        columns["expired_allowances"] = expired_allowances
+        columns["day_index"] = np.broadcast_to(days, requests.shape)
+        columns["billing_day"] = np.broadcast_to(billing_days, requests.shape)
+        columns["intervention_type"] = np.array(_INTERVENTION_LABELS)[
+            intervention_codes
+        ]
+        return {f.name: columns[f.name].reshape(shape) for f in fields(DayResult)}
+
+    @staticmethod
+    def simulate_range(
+        requests,
+        rule: SGMRule,
+        wallet_config: Optional[WalletConfig] = None,
+        reserved_config: Optional[ReservedVolumesConfig] = None,
+        manual_allowances: Optional[List[ManualAllowance]] = None,
+        daily_allowances=None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Simulate consecutive days starting from day 0 with an empty wallet
+        Billing days follow the reserved config (or stay at 1), like the CLI
+        daily_allowances holds one same-day allowance per day, like the legacy
+        manual_allowance parameter of simulate_day
+        Returns: one array per DayResult field, as day_results_to_arrays does
+        """
+        return BatchedSimulator(
+            rule, wallet_config, reserved_config, manual_allowances
+        ).run(requests, daily_allowances)
+
+
+class BatchedSimulator:
+    """
+    Multi-day runner that keeps its preallocated output columns between runs
+    Columns are overwritten by the next run of the same length
+    """
+
+    def __init__(
+        self,
+        rule: SGMRule,
+        wallet_config: Optional[WalletConfig] = None,
+        reserved_config: Optional[ReservedVolumesConfig] = None,
+        manual_allowances: Optional[List[ManualAllowance]] = None,
+    ):
+        self.rule = rule
+        self.wallet_config = (
+            wallet_config if wallet_config is not None else WalletConfig()
         )
+        self.reserved_config = reserved_config
+
+        # The wallet model only scales the daily limit, so resolve it once
+        self.capacity_multiplier = self.wallet_config.capacity_multiplier()
+
+        # Allowances are converted once and reused for every day of every run
+        self.allowance_arrays = ManualAllowance.to_arrays(manual_allowances or [])
+
+        self.columns: Dict[str, np.ndarray] = {}
+        self.history_cumsum = np.zeros(1, dtype=np.float64)
+        self._allocate(0)
+
+    def _allocate(self, num_days: int) -> None:
+        """Preallocate one column per DayResult field plus the running history sum"""
+        self.columns = {}
+        for f in fields(DayResult):
+            if f.name == "intervention_type":
+                self.columns[f.name] = np.empty(num_days, dtype="<U8")
+            elif f.name in ("day_index", "billing_day"):
+                self.columns[f.name] = np.empty(num_days, dtype=np.int64)
+            else:
+                self.columns[f.name] = np.empty(num_days, dtype=np.float64)
 
-        return result, updated_last_recalc_day, updated_baseline
+        # InterventionType code per day, alongside the intervention_type labels
+        self.intervention_codes = np.zeros(num_days, dtype=np.int8)
+
+        # history_cumsum[i] is the total accepted spend of days 0..i-1,
+        # so any trailing window is a difference of two entries
+        self.history_cumsum = np.zeros(num_days + 1, dtype=np.float64)
+
+    @property
+    def accepted(self) -> np.ndarray:
+        """Total accepted spend per day"""
+        return self.columns["accepted_spend"]
+
+    @property
+    def rejected(self) -> np.ndarray:
+        """Rejected spend per day"""
+        return self.columns["rejected_spend"]
+
+    @property
+    def wallet_end(self) -> np.ndarray:
+        """Wallet balance at the end of each day"""
+        return self.columns["wallet_balance_end"]
+
+    @property
+    def daily_limit(self) -> np.ndarray:
+        """Daily spend limit per day"""
+        return self.columns["daily_spend_limit"]
+
+    def run(self, requests, daily_allowances=None) -> Dict[str, np.ndarray]:
+        """
+        Simulate consecutive days starting from day 0 with an empty wallet
+        Billing days follow the reserved config (or stay at 1), like the CLI
+        daily_allowances holds one same-day allowance per day, like the legacy
+        manual_allowance parameter of simulate_day
+        Returns: one array per DayResult field, as day_results_to_arrays does
+        """
+        requests = np.asarray(requests, dtype=np.float64)
+        num_days = len(requests)
+        if daily_allowances is None:
+            daily_allowances = np.zeros(num_days, dtype=np.float64)
+        else:
+            daily_allowances = np.asarray(daily_allowances, dtype=np.float64)
+        if len(self.history_cumsum) != num_days + 1:
+            self._allocate(num_days)
+
+        rule = self.rule
+        capacity_multiplier = self.capacity_multiplier
+        reserved_config = self.reserved_config
+        allowance_arrays = self.allowance_arrays
+        history_cumsum = self.history_cumsum
+        intervention_codes = self.intervention_codes
+        columns = [self.columns[f.name] for f in fields(DayResult)]
+
+        # Billing days only depend on the day index, so lay them out up front
+        # along with the days that start a new billing cycle
+        if reserved_config:
+            billing_days = reserved_config.billing_days(num_days)
+            cycle_resets = billing_days == 1
+            cycle_resets[:1] = False
+        else:
+            billing_days = np.ones(num_days, dtype=np.int64)
+            cycle_resets = np.zeros(num_days, dtype=bool)
+
+        if not rule.weekly_recalc_enabled and not len(allowance_arrays[0]):
+            # No recalculation state or expiring allowances to track, so the
+            # whole run is one pass of the compiled kernel
+            out = self.columns
+            out["day_index"][:] = np.arange(num_days)
+            out["billing_day"][:] = billing_days
+            out["requested_spend"][:] = requests
+            out["expired_allowances"][:] = 0.0
+            _simulate_days_kernel(
+                requests,
+                daily_allowances,
+                cycle_resets,
+                float(rule.growth_percentage),
+                rule.daily_growth_factor,
+                float(rule.min_growth_dollars),
+                float(capacity_multiplier),
+                float(reserved_config.monthly_volume) if reserved_config else 0.0,
+                out["accepted_spend"],
+                out["rejected_spend"],
+                out["reserved_spend"],
+                out["sgm_spend"],
+                out["daily_spend_limit"],
+                out["wallet_balance_start"],
+                out["wallet_balance_end"],
+                out["wallet_max_capacity"],
+                out["reserved_remaining"],
+                out["cumulative_reserved_used"],
+                out["manual_allowances_used"],
+                intervention_codes,
+                history_cumsum,
+            )
+            out["intervention_type"][:] = np.array(_INTERVENTION_LABELS)[
+                intervention_codes
+            ]
+            return out
+
+        # The wallet and history recurrences depend on the previous day,
+        # so this is a single pass writing into the preallocated columns
+        wallet_balance = 0.0
+        cumulative_reserved = 0.0
+        last_recalc_day = 0
+        baseline_spend = None
+
+        # Compensated running total of accepted spend, so window differences
+        # of history_cumsum stay within about an ulp of a direct sum
+        running_total = 0.0
+        compensation = 0.0
+
+        for day_index in range(num_days):
+            # Reset cumulative on new billing cycle
+            if cycle_resets[day_index]:
+                cumulative_reserved = 0.0
+
+            total = history_cumsum[day_index]
+            recent_7 = float(total - history_cumsum[max(day_index - 7, 0)])
+            recent_6 = float(total - history_cumsum[max(day_index - 6, 0)])
+
+            values, last_recalc_day, baseline_spend = SGMEngine._simulate_day_values(
+                day_index,
+                int(billing_days[day_index]),
+                float(requests[day_index]),
+                wallet_balance,
+                day_index,
+                recent_7,
+                recent_6,
+                rule,
+                capacity_multiplier,
+                reserved_config,
+                cumulative_reserved,
+                allowance_arrays,
+                last_recalc_day,
+                baseline_spend,
+                float(daily_allowances[day_index]),
+            )
+            for column, value in zip(columns, values):
+                column[day_index] = value
+            intervention_codes[day_index] = _INTERVENTION_CODES[values[11]]
+
+            # Update state for next iteration
+            running_total, compensation = _neumaier_add(
+                running_total, compensation, values[3]  # Total accepted spend
+            )
+            history_cumsum[day_index + 1] = running_total + compensation
+            wallet_balance = values[9]  # Wallet balance end
+            cumulative_reserved = values[13]  # Cumulative reserved used
+
+        return self.columns
+
+
+class SGMState:
+    """
+    Day-by-day runner carrying the state callers would otherwise thread through
+    simulate_day: accepted history with rolling 7/6-day sums, wallet balance,
+    reserved usage and weekly recalculation state
+    """
+
+    def __init__(
+        self,
+        rule: SGMRule,
+        wallet_config: Optional[WalletConfig] = None,
+        reserved_config: Optional[ReservedVolumesConfig] = None,
+        manual_allowances: Optional[List[ManualAllowance]] = None,
+    ):
+        self.rule = rule
+        self.reserved_config = reserved_config
+        self.capacity_multiplier = (
+            wallet_config if wallet_config is not None else WalletConfig()
+        ).capacity_multiplier()
+        self.allowance_arrays = ManualAllowance.to_arrays(manual_allowances or [])
+
+        self.accepted_history = array.array("d")
+        self.sum_last_7 = 0.0
+        self.sum_last_6 = 0.0
+
+        # Compensated prefix sums of accepted spend, as BatchedSimulator keeps
+        # in history_cumsum, so the window sums do not drift over long runs
+        self.history_cumsum = array.array("d", [0.0])
+        self._running_total = 0.0
+        self._compensation = 0.0
+        self.wallet_balance = 0.0
+        self.cumulative_reserved = 0.0
+        self.last_recalc_day = 0
+        self.baseline_spend: Optional[float] = None
+
+    def advance(
+        self, requested_spend: float, billing_day: int, manual_allowance: float = 0.0
+    ) -> DayResult:
+        """
+        Simulate the next day like simulate_day (manual_allowance is the legacy
+        same-day amount) and fold its result into the state
+        Returns: the day's DayResult
+        """
+        history = self.accepted_history
+        day_index = len(history)
+
+        values, self.last_recalc_day, self.baseline_spend = (
+            SGMEngine._simulate_day_values(
+                day_index,
+                billing_day,
+                requested_spend,
+                self.wallet_balance,
+                day_index,
+                self.sum_last_7,
+                self.sum_last_6,
+                self.rule,
+                self.capacity_multiplier,
+                self.reserved_config,
+                self.cumulative_reserved,
+                self.allowance_arrays,
+                self.last_recalc_day,
+                self.baseline_spend,
+                manual_allowance,
+            )
+        )
+
+        # Slide both windows forward by one day as differences of the
+        # compensated prefix sums
+        accepted = values[3]  # Total accepted spend
+        history.append(accepted)
+        self._running_total, self._compensation = _neumaier_add(
+            self._running_total, self._compensation, accepted
+        )
+        cumsum = self.history_cumsum
+        cumsum.append(self._running_total + self._compensation)
+        total = cumsum[-1]
+        self.sum_last_7 = total - cumsum[max(day_index - 6, 0)]
+        self.sum_last_6 = total - cumsum[max(day_index - 5, 0)]
+
+        self.wallet_balance = values[9]  # Wallet balance end
+        self.cumulative_reserved = values[13]  # Cumulative reserved used
+        return DayResult(*values)
 
 
 # =============================================================================
@@ -401,17 +1437,21 @@ class SGMEngine:
 # =============================================================================
 
 
+# Built once at import; create_usage_scenarios hands out fresh list copies
+_USAGE_SCENARIOS: Tuple[Tuple[str, Tuple[float, ...]], ...] = (
+    ("steady_growth", tuple(50 + i * 2 for i in range(30))),
+    ("traffic_spike", (30,) * 10 + (150,) * 3 + (30,) * 17),
+    ("gradual_ramp", tuple(10 * (1.1**i) for i in range(30))),
+    ("weekend_spikes", tuple(30 if i % 7 < 5 else 80 for i in range(30))),
+    ("developer_mistake", (20,) * 9 + (500,) + (20,) * 20),
+    ("viral_moment", (50,) * 14 + (200, 250, 300, 350, 400) + (100,) * 11),
+    ("random_variation", tuple(30 + (i * 17 + i * i * 3) % 40 for i in range(30))),
+)
+
+
 def create_usage_scenarios() -> Dict[str, List[float]]:
     """Create predefined usage scenarios"""
-    return {
-        "steady_growth": [50 + i * 2 for i in range(30)],
-        "traffic_spike": [30] * 10 + [150] * 3 + [30] * 17,
-        "gradual_ramp": [10 * (1.1**i) for i in range(30)],
-        "weekend_spikes": [30 if i % 7 < 5 else 80 for i in range(30)],
-        "developer_mistake": [20] * 9 + [500] + [20] * 20,
-        "viral_moment": [50] * 14 + [200, 250, 300, 350, 400] + [100] * 11,
-        "random_variation": [30 + (i * 17 + i * i * 3) % 40 for i in range(30)],
-    }
+    return {name: list(daily_spends) for name, daily_spends in _USAGE_SCENARIOS}
 
 
 # =============================================================================
@@ -469,26 +1509,29 @@ def run_cli():
     # Run simulation
     results = []
     wallet_balance = 0.0
-    accepted_history = []
+    accepted_history = array.array("d")  # Contiguous doubles, not PyFloat objects
     billing_day = args.billing_day if reserved else 1
     cumulative_reserved = 0.0
     last_recalc_day = 0
     baseline_spend = None
+    wallet_config = WalletConfig()
+    manual_allowances: List[ManualAllowance] = []
 
     for day_index, spend in enumerate(daily_spends):
+        # Positional call in simulate_day's parameter order (no kwargs per day)
         result, last_recalc_day, baseline_spend = SGMEngine.simulate_day(
-            day_index=day_index,
-            billing_day=billing_day,
-            requested_spend=spend,
-            wallet_balance=wallet_balance,
-            accepted_history=accepted_history,
-            rule=rule,
-            wallet_config=WalletConfig(),
-            reserved_config=reserved,
-            cumulative_reserved_used=cumulative_reserved,
-            manual_allowances=[],
-            last_recalc_day=last_recalc_day,
-            baseline_spend=baseline_spend,
+            day_index,
+            billing_day,
+            spend,
+            wallet_balance,
+            accepted_history,
+            rule,
+            wallet_config,
+            reserved,
+            cumulative_reserved,
+            manual_allowances,
+            last_recalc_day,
+            baseline_spend,
         )
         results.append(result)
 
@@ -577,12 +1620,246 @@ def run_cli():
         print(f"Week 1 Acceptance Rate: {week_acceptance_rate:.1f}%")
 
 
+# =============================================================================
+# CHART RENDERING
+# =============================================================================
+
+
+def collect_intervention_regions(days: List[DayResult]) -> List[Dict]:
+    """Collect the days with an active intervention for chart backgrounds"""
+    intervention_regions = []
+    for i, day in enumerate(days):
+        if day.intervention_type != "none":
+            intervention_regions.append(
+                {
+                    "day": i,
+                    "type": day.intervention_type,
+                    "rejection_rate": (
+                        (day.rejected_spend / day.requested_spend * 100)
+                        if day.requested_spend > 0
+                        else 0
+                    ),
+                }
+            )
+    return intervention_regions
+
+
+def _add_intervention_backgrounds(fig, intervention_regions: List[Dict]) -> None:
+    """Shade consecutive intervention days of the same type on a Plotly figure"""
+
+    def add_region(start, end, region_type):
+        color = (
+            "rgba(255, 0, 0, 0.2)"
+            if region_type == "shutdown"
+            else "rgba(255, 165, 0, 0.2)"
+        )
+        fig.add_vrect(
+            x0=start - 0.4,
+            x1=end + 0.4,
+            fillcolor=color,
+            line_width=0,
+            annotation_text=f"{region_type.title()}",
+            annotation_position="top left",
+            annotation_font_size=10,
+        )
+
+    current_start = None
+    current_type = None
+    current_end = None
+
+    for region in intervention_regions:
+        if current_start is None:
+            current_start = region["day"]
+            current_type = region["type"]
+            current_end = region["day"]
+        elif region["type"] == current_type and region["day"] == current_end + 1:
+            current_end = region["day"]
+        else:
+            # Add the completed region and start a new one
+            add_region(current_start, current_end, current_type)
+            current_start = region["day"]
+            current_type = region["type"]
+            current_end = region["day"]
+
+    # Add the final region
+    if current_start is not None:
+        add_region(current_start, current_end, current_type)
+
+
+def _render_spend_chart_plotly(
+    days_to_show: List[DayResult], intervention_regions: List[Dict]
+) -> None:
+    """Daily spend chart with intervention backgrounds (Plotly)"""
+    fig = go.Figure()
+
+    # Add intervention background regions first (so they appear behind the lines)
+    _add_intervention_backgrounds(fig, intervention_regions)
+
+    # Add the main data lines
+    days_range = list(range(len(days_to_show)))
+
+    fig.add_trace(
+        go.Scatter(
+            x=days_range,
+            y=[d.requested_spend for d in days_to_show],
+            mode="lines+markers",
+            name="Requested",
+            line=dict(color="#1f77b4", width=2),
+            marker=dict(size=4),
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=days_range,
+            y=[d.accepted_spend for d in days_to_show],
+            mode="lines+markers",
+            name="Accepted",
+            line=dict(color="#2ca02c", width=2),
+            marker=dict(size=4),
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=days_range,
+            y=[d.daily_spend_limit for d in days_to_show],
+            mode="lines",
+            name="Daily Limit",
+            line=dict(color="#ff7f0e", width=2, dash="dash"),
+        )
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=days_range,
+            y=[d.manual_allowances_used for d in days_to_show],
+            mode="lines+markers",
+            name="Manual Used",
+            line=dict(color="#d62728", width=2),
+            marker=dict(size=4),
+        )
+    )
+
+    fig.update_layout(
+        title="Daily Spend Analysis",
+        xaxis_title="Day",
+        yaxis_title="Amount ($)",
+        template="simple_white",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(t=80),
+    )
+
+    st.plotly_chart(fig, use_container_width=True, config=_PLOTLY_CONFIG, theme=None)
+
+    # Add intervention legend
+    if intervention_regions:
+        st.caption(
+            "🎨 **Chart Legend:** Orange background = Throttle intervention, Red background = Shutdown intervention"
+        )
+
+
+def _render_spend_chart_fallback(
+    days_to_show: List[DayResult], intervention_regions: List[Dict]
+) -> None:
+    """Basic Streamlit spend chart used when Plotly is not available"""
+    spend_data = {
+        "Requested": [d.requested_spend for d in days_to_show],
+        "Accepted": [d.accepted_spend for d in days_to_show],
+        "Daily Limit": [d.daily_spend_limit for d in days_to_show],
+        "Manual Used": [d.manual_allowances_used for d in days_to_show],
+    }
+    st.line_chart(spend_data)
+    st.warning(
+        "📦 Install plotly for enhanced charts with intervention backgrounds: `pip install plotly`"
+    )
+
+
+def _render_wallet_chart_plotly(
+    days_to_show: List[DayResult], intervention_regions: List[Dict]
+) -> None:
+    """SGM wallet balance chart with intervention backgrounds (Plotly)"""
+    fig_wallet = go.Figure()
+
+    # Add intervention background regions first
+    _add_intervention_backgrounds(fig_wallet, intervention_regions)
+
+    days_range = list(range(len(days_to_show)))
+
+    # Add wallet data lines
+    fig_wallet.add_trace(
+        go.Scatter(
+            x=days_range,
+            y=[d.wallet_balance_end for d in days_to_show],
+            mode="lines+markers",
+            name="Wallet Balance",
+            line=dict(color="#2ca02c", width=3),
+            marker=dict(size=4),
+            fill="tonexty" if len(days_to_show) > 1 else None,
+            fillcolor="rgba(44, 160, 44, 0.1)",
+        )
+    )
+
+    fig_wallet.add_trace(
+        go.Scatter(
+            x=days_range,
+            y=[d.daily_spend_limit * 2 for d in days_to_show],
+            mode="lines",
+            name="Wallet Capacity",
+            line=dict(color="#ff7f0e", width=2, dash="dash"),
+        )
+    )
+
+    fig_wallet.update_layout(
+        title="SGM Wallet Balance",
+        xaxis_title="Day",
+        yaxis_title="Balance ($)",
+        template="simple_white",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(t=80),
+    )
+
+    st.plotly_chart(
+        fig_wallet, use_container_width=True, config=_PLOTLY_CONFIG, theme=None
+    )
+
+    # Add intervention legend
+    if intervention_regions:
+        st.caption(
+            "🎨 **Chart Legend:** Orange background = Throttle intervention, Red background = Shutdown intervention"
+        )
+
+
+def _render_wallet_chart_fallback(
+    days_to_show: List[DayResult], intervention_regions: List[Dict]
+) -> None:
+    """Basic Streamlit wallet chart used when Plotly is not available"""
+    wallet_data = {
+        "Wallet Balance": [d.wallet_balance_end for d in days_to_show],
+        "Wallet Capacity": [d.daily_spend_limit * 2 for d in days_to_show],
+    }
+    st.line_chart(wallet_data)
+    st.warning(
+        "📦 Install plotly for enhanced charts with intervention backgrounds: `pip install plotly`"
+    )
+
+
+# Plotly availability never changes within a session, so pick the renderers once
+render_spend_chart = (
+    _render_spend_chart_plotly if PLOTLY_AVAILABLE else _render_spend_chart_fallback
+)
+render_wallet_chart = (
+    _render_wallet_chart_plotly if PLOTLY_AVAILABLE else _render_wallet_chart_fallback
+)
+
+
 # =============================================================================
 # STREAMLIT UI
 # =============================================================================
 
 # Only import streamlit if not in CLI mode
 if "--cli" not in sys.argv and len(sys.argv) <= 1:
+    import pandas as pd
     import streamlit as st
 
     # Page config
@@ -603,6 +1880,15 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
         st.session_state.cumulative_reserved = 0.0
         st.session_state.baseline_spend = None  # For weekly recalculation
         st.session_state.invoices = []  # List of Invoice objects
+        st.session_state.has_bootstrap_drop = False  # Day-7 wallet drop flag
+
+    def update_bootstrap_drop_flag():
+        """Record once per simulation change whether the wallet dropped after bootstrap"""
+        days = st.session_state.simulation_days
+        st.session_state.has_bootstrap_drop = (
+            len(days) >= 8
+            and days[6].wallet_balance_end > days[7].wallet_balance_start * 1.5
+        )
 
     # Sidebar controls
     st.sidebar.title("🎛️ SGM Controls")
@@ -973,6 +2259,7 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
             st.session_state.current_day_index = (
                 len(st.session_state.simulation_days) - 1
             )
+            update_bootstrap_drop_flag()
             st.rerun()
 
     # Main content area
@@ -1211,6 +2498,7 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
         st.session_state.accepted_history.append(result.accepted_spend)
         st.session_state.cumulative_reserved = result.cumulative_reserved_used
         st.session_state.current_day_index = len(st.session_state.simulation_days) - 1
+        update_bootstrap_drop_flag()
         st.rerun()
 
     def undo_last_day():
@@ -1253,6 +2541,7 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
                 )
                 st.session_state.cumulative_reserved = 0.0
                 st.session_state.current_day_index = -1
+            update_bootstrap_drop_flag()
             st.rerun()
 
     def simulate_next_week():
@@ -1316,6 +2605,7 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
             st.session_state.cumulative_reserved = result.cumulative_reserved_used
 
         st.session_state.current_day_index = len(st.session_state.simulation_days) - 1
+        update_bootstrap_drop_flag()
         st.rerun()
 
     def simulate_next_month():
@@ -1379,6 +2669,7 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
             st.session_state.cumulative_reserved = result.cumulative_reserved_used
 
         st.session_state.current_day_index = len(st.session_state.simulation_days) - 1
+        update_bootstrap_drop_flag()
         st.rerun()
 
     # Unified Controls Section
@@ -1502,6 +2793,7 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
             st.session_state.billing_day = reserved.billing_day_start if reserved else 1
             st.session_state.cumulative_reserved = 0.0
             st.session_state.invoices = []
+            update_bootstrap_drop_flag()
             st.rerun()
 
         st.divider()
@@ -2454,280 +3746,23 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
         days_to_show = st.session_state.simulation_days[
             : st.session_state.current_day_index + 1
         ]
+        arrs = day_results_to_arrays(days_to_show)
+
+        # Intervention regions shared by both chart backgrounds
+        intervention_regions = collect_intervention_regions(days_to_show)
 
         # Spend chart with intervention backgrounds
         st.subheader("📈 Daily Spend Analysis")
-
-        if PLOTLY_AVAILABLE:
-            # Create Plotly chart with intervention backgrounds
-            fig = go.Figure()
-
-            # Add intervention background regions first (so they appear behind the lines)
-            intervention_regions = []
-            for i, day in enumerate(days_to_show):
-                if day.intervention_type != "none":
-                    intervention_regions.append(
-                        {
-                            "day": i,
-                            "type": day.intervention_type,
-                            "rejection_rate": (
-                                (day.rejected_spend / day.requested_spend * 100)
-                                if day.requested_spend > 0
-                                else 0
-                            ),
-                        }
-                    )
-
-            # Group consecutive intervention days
-            if intervention_regions:
-                current_start = None
-                current_type = None
-
-                for region in intervention_regions:
-                    if current_start is None:
-                        current_start = region["day"]
-                        current_type = region["type"]
-                        current_end = region["day"]
-                    elif (
-                        region["type"] == current_type
-                        and region["day"] == current_end + 1
-                    ):
-                        current_end = region["day"]
-                    else:
-                        # Add the completed region
-                        color = (
-                            "rgba(255, 0, 0, 0.2)"
-                            if current_type == "shutdown"
-                            else "rgba(255, 165, 0, 0.2)"
-                        )
-                        fig.add_vrect(
-                            x0=current_start - 0.4,
-                            x1=current_end + 0.4,
-                            fillcolor=color,
-                            line_width=0,
-                            annotation_text=f"{current_type.title()}",
-                            annotation_position="top left",
-                            annotation_font_size=10,
-                        )
-                        # Start new region
-                        current_start = region["day"]
-                        current_type = region["type"]
-                        current_end = region["day"]
-
-                # Add the final region
-                if current_start is not None:
-                    color = (
-                        "rgba(255, 0, 0, 0.2)"
-                        if current_type == "shutdown"
-                        else "rgba(255, 165, 0, 0.2)"
-                    )
-                    fig.add_vrect(
-                        x0=current_start - 0.4,
-                        x1=current_end + 0.4,
-                        fillcolor=color,
-                        line_width=0,
-                        annotation_text=f"{current_type.title()}",
-                        annotation_position="top left",
-                        annotation_font_size=10,
-                    )
-
-            # Add the main data lines
-            days_range = list(range(len(days_to_show)))
-
-            fig.add_trace(
-                go.Scatter(
-                    x=days_range,
-                    y=[d.requested_spend for d in days_to_show],
-                    mode="lines+markers",
-                    name="Requested",
-                    line=dict(color="#1f77b4", width=2),
-                    marker=dict(size=4),
-                )
-            )
-
-            fig.add_trace(
-                go.Scatter(
-                    x=days_range,
-                    y=[d.accepted_spend for d in days_to_show],
-                    mode="lines+markers",
-                    name="Accepted",
-                    line=dict(color="#2ca02c", width=2),
-                    marker=dict(size=4),
-                )
-            )
-
-            fig.add_trace(
-                go.Scatter(
-                    x=days_range,
-                    y=[d.daily_spend_limit for d in days_to_show],
-                    mode="lines",
-                    name="Daily Limit",
-                    line=dict(color="#ff7f0e", width=2, dash="dash"),
-                )
-            )
-
-            fig.add_trace(
-                go.Scatter(
-                    x=days_range,
-                    y=[d.manual_allowances_used for d in days_to_show],
-                    mode="lines+markers",
-                    name="Manual Used",
-                    line=dict(color="#d62728", width=2),
-                    marker=dict(size=4),
-                )
-            )
-
-            fig.update_layout(
-                title="Daily Spend Analysis",
-                xaxis_title="Day",
-                yaxis_title="Amount ($)",
-                hovermode="x unified",
-                legend=dict(
-                    orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1
-                ),
-                margin=dict(t=80),
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
-
-            # Add intervention legend
-            if intervention_regions:
-                st.caption(
-                    "🎨 **Chart Legend:** Orange background = Throttle intervention, Red background = Shutdown intervention"
-                )
-        else:
-            # Fallback to basic Streamlit chart if Plotly not available
-            spend_data = {
-                "Requested": [d.requested_spend for d in days_to_show],
-                "Accepted": [d.accepted_spend for d in days_to_show],
-                "Daily Limit": [d.daily_spend_limit for d in days_to_show],
-                "Manual Used": [d.manual_allowances_used for d in days_to_show],
-            }
-            st.line_chart(spend_data)
-            st.warning(
-                "📦 Install plotly for enhanced charts with intervention backgrounds: `pip install plotly`"
-            )
+        render_spend_chart(days_to_show, intervention_regions)
 
         # SGM Wallet chart with intervention backgrounds
         st.subheader("💰 SGM Wallet Balance")
-
-        if PLOTLY_AVAILABLE:
-            # Create Plotly wallet chart with intervention backgrounds
-            fig_wallet = go.Figure()
-
-            # Add intervention background regions first
-            if intervention_regions:
-                current_start = None
-                current_type = None
-
-                for region in intervention_regions:
-                    if current_start is None:
-                        current_start = region["day"]
-                        current_type = region["type"]
-                        current_end = region["day"]
-                    elif (
-                        region["type"] == current_type
-                        and region["day"] == current_end + 1
-                    ):
-                        current_end = region["day"]
-                    else:
-                        # Add the completed region
-                        color = (
-                            "rgba(255, 0, 0, 0.2)"
-                            if current_type == "shutdown"
-                            else "rgba(255, 165, 0, 0.2)"
-                        )
-                        fig_wallet.add_vrect(
-                            x0=current_start - 0.4,
-                            x1=current_end + 0.4,
-                            fillcolor=color,
-                            line_width=0,
-                            annotation_text=f"{current_type.title()}",
-                            annotation_position="top left",
-                            annotation_font_size=10,
-                        )
-                        # Start new region
-                        current_start = region["day"]
-                        current_type = region["type"]
-                        current_end = region["day"]
-
-                # Add the final region
-                if current_start is not None:
-                    color = (
-                        "rgba(255, 0, 0, 0.2)"
-                        if current_type == "shutdown"
-                        else "rgba(255, 165, 0, 0.2)"
-                    )
-                    fig_wallet.add_vrect(
-                        x0=current_start - 0.4,
-                        x1=current_end + 0.4,
-                        fillcolor=color,
-                        line_width=0,
-                        annotation_text=f"{current_type.title()}",
-                        annotation_position="top left",
-                        annotation_font_size=10,
-                    )
-
-            # Add wallet data lines
-            fig_wallet.add_trace(
-                go.Scatter(
-                    x=days_range,
-                    y=[d.wallet_balance_end for d in days_to_show],
-                    mode="lines+markers",
-                    name="Wallet Balance",
-                    line=dict(color="#2ca02c", width=3),
-                    marker=dict(size=4),
-                    fill="tonexty" if len(days_to_show) > 1 else None,
-                    fillcolor="rgba(44, 160, 44, 0.1)",
-                )
-            )
-
-            fig_wallet.add_trace(
-                go.Scatter(
-                    x=days_range,
-                    y=[d.daily_spend_limit * 2 for d in days_to_show],
-                    mode="lines",
-                    name="Wallet Capacity",
-                    line=dict(color="#ff7f0e", width=2, dash="dash"),
-                )
-            )
-
-            fig_wallet.update_layout(
-                title="SGM Wallet Balance",
-                xaxis_title="Day",
-                yaxis_title="Balance ($)",
-                hovermode="x unified",
-                legend=dict(
-                    orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1
-                ),
-                margin=dict(t=80),
-            )
-
-            st.plotly_chart(fig_wallet, use_container_width=True)
-
-            # Add intervention legend
-            if intervention_regions:
-                st.caption(
-                    "🎨 **Chart Legend:** Orange background = Throttle intervention, Red background = Shutdown intervention"
-                )
-        else:
-            # Fallback to basic Streamlit chart if Plotly not available
-            wallet_data = {
-                "Wallet Balance": [d.wallet_balance_end for d in days_to_show],
-                "Wallet Capacity": [d.daily_spend_limit * 2 for d in days_to_show],
-            }
-            st.line_chart(wallet_data)
-            st.warning(
-                "📦 Install plotly for enhanced charts with intervention backgrounds: `pip install plotly`"
-            )
+        render_wallet_chart(days_to_show, intervention_regions)
 
         # Add explanation for wallet drops
         if len(days_to_show) >= 8:
-            # Check if there's a significant wallet drop around day 7
-            if (
-                days_to_show[6].wallet_balance_end
-                > days_to_show[7].wallet_balance_start * 1.5
-            ):
+            # Significant wallet drop around day 7 (flag computed at simulation time)
+            if st.session_state.get("has_bootstrap_drop"):
                 st.info(
                     """
                 **💡 Why did the wallet drop after day 7?**
@@ -2788,10 +3823,9 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
             # Show first week performance
             if len(days_to_show) >= 7:
                 st.write("\n**First Week Performance:**")
-                week1_days = days_to_show[:7]
-                week1_requested = sum(d.requested_spend for d in week1_days)
-                week1_accepted = sum(d.accepted_spend for d in week1_days)
-                week1_sgm = sum(d.sgm_spend for d in week1_days)
+                week1_requested = float(arrs["requested_spend"][:7].sum())
+                week1_accepted = float(arrs["accepted_spend"][:7].sum())
+                week1_sgm = float(arrs["sgm_spend"][:7].sum())
                 st.write(f"• Week 1 Requested: ${week1_requested:.2f}")
                 st.write(f"• Week 1 SGM Accepted: ${week1_sgm:.2f}")
                 week1_accept_rate = (week1_accepted/week1_requested)*100 if week1_requested > 0 else 0
@@ -2861,35 +3895,64 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
                 st.divider()
                 forecast_col1, forecast_col2, forecast_col3 = st.columns(3)
 
+                forecast = cycle_data["forecast"]
+
                 with forecast_col1:
                     st.markdown("**📊 Daily Averages**")
-                    st.write(
-                        f"• Avg SGM/day: ${cycle_data['forecast']['avg_daily_sgm']:.2f}"
-                    )
-                    st.write(
-                        f"• Avg Reserved/day: ${cycle_data['forecast']['avg_daily_reserved']:.2f}"
-                    )
-                    st.write(
-                        f"• Avg Total/day: ${cycle_data['forecast']['avg_daily_accepted']:.2f}"
+                    st.dataframe(
+                        pd.DataFrame(
+                            {
+                                "Metric": [
+                                    "Avg SGM/day",
+                                    "Avg Reserved/day",
+                                    "Avg Total/day",
+                                ],
+                                "Value": [
+                                    f"${forecast['avg_daily_sgm']:.2f}",
+                                    f"${forecast['avg_daily_reserved']:.2f}",
+                                    f"${forecast['avg_daily_accepted']:.2f}",
+                                ],
+                            }
+                        ),
+                        hide_index=True,
+                        use_container_width=True,
                     )
 
                 with forecast_col2:
                     st.markdown("**🔮 Remaining Forecast**")
-                    st.write(f"• Days left: {cycle_data['forecast']['days_remaining']}")
-                    st.write(
-                        f"• Forecast SGM: ${cycle_data['forecast']['forecast_sgm']:.2f}"
-                    )
-                    st.write(
-                        f"• Forecast Reserved: ${cycle_data['forecast']['forecast_reserved']:.2f}"
+                    st.dataframe(
+                        pd.DataFrame(
+                            {
+                                "Metric": [
+                                    "Days left",
+                                    "Forecast SGM",
+                                    "Forecast Reserved",
+                                ],
+                                "Value": [
+                                    f"{forecast['days_remaining']}",
+                                    f"${forecast['forecast_sgm']:.2f}",
+                                    f"${forecast['forecast_reserved']:.2f}",
+                                ],
+                            }
+                        ),
+                        hide_index=True,
+                        use_container_width=True,
                     )
 
                 with forecast_col3:
                     st.markdown("**🎯 Projected Totals**")
-                    st.write(
-                        f"• Total SGM: ${cycle_data['forecast']['projected_total_sgm']:.2f}"
-                    )
-                    st.write(
-                        f"• Total Reserved: ${cycle_data['forecast']['projected_total_reserved']:.2f}"
+                    st.dataframe(
+                        pd.DataFrame(
+                            {
+                                "Metric": ["Total SGM", "Total Reserved"],
+                                "Value": [
+                                    f"${forecast['projected_total_sgm']:.2f}",
+                                    f"${forecast['projected_total_reserved']:.2f}",
+                                ],
+                            }
+                        ),
+                        hide_index=True,
+                        use_container_width=True,
                     )
 
                     # Highlight projected invoice
@@ -3052,10 +4115,16 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
                         title="Cumulative Spending - Current Cycle (with Forecast)",
                         xaxis_title="Billing Day",
                         yaxis_title="Amount ($)",
+                        template="simple_white",
                         height=400,
                         showlegend=True,
                     )
-                    st.plotly_chart(fig_cumulative, use_container_width=True)
+                    st.plotly_chart(
+                        fig_cumulative,
+                        use_container_width=True,
+                        config=_PLOTLY_CONFIG,
+                        theme=None,
+                    )
 
                 with chart_col2:
                     # Daily spending chart
@@ -3083,11 +4152,17 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
                         title="Daily Spending - Current Cycle",
                         xaxis_title="Billing Day",
                         yaxis_title="Amount ($)",
+                        template="simple_white",
                         height=400,
                         barmode="stack",
                         showlegend=True,
                     )
-                    st.plotly_chart(fig_daily, use_container_width=True)
+                    st.plotly_chart(
+                        fig_daily,
+                        use_container_width=True,
+                        config=_PLOTLY_CONFIG,
+                        theme=None,
+                    )
 
         # Invoice tracking and ARR section
         if st.session_state.invoices and PLOTLY_AVAILABLE:
@@ -3098,9 +4173,8 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
 
             with invoice_col1:
                 st.markdown("**📋 Recent Invoices**")
-                # Show last 5 invoices
-                recent_invoices = st.session_state.invoices[-5:]
-                for invoice in reversed(recent_invoices):
+                # Show last 5 invoices, newest first
+                for invoice in islice(reversed(st.session_state.invoices), 5):
                     with st.expander(
                         f"Invoice #{invoice.billing_cycle} - ${invoice.total_amount:.2f}"
                     ):
@@ -3186,10 +4260,16 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
                         title="Invoice Amounts by Billing Cycle",
                         xaxis_title="Billing Cycle",
                         yaxis_title="Amount ($)",
+                        template="simple_white",
                         height=400,
                         showlegend=True,
                     )
-                    st.plotly_chart(fig_invoices, use_container_width=True)
+                    st.plotly_chart(
+                        fig_invoices,
+                        use_container_width=True,
+                        config=_PLOTLY_CONFIG,
+                        theme=None,
+                    )
 
                 with chart_col2:
                     # ARR trend over time
@@ -3220,24 +4300,34 @@ if "--cli" not in sys.argv and len(sys.argv) <= 1:
                         title="Annual Recurring Revenue (ARR) Trend",
                         xaxis_title="Billing Cycle",
                         yaxis_title="ARR ($)",
+                        template="simple_white",
                         height=400,
                         showlegend=False,
                     )
-                    st.plotly_chart(fig_arr, use_container_width=True)
+                    st.plotly_chart(
+                        fig_arr,
+                        use_container_width=True,
+                        config=_PLOTLY_CONFIG,
+                        theme=None,
+                    )
 
         # Export
         if st.button("📊 Export Data"):
-            csv_lines = [
-                "Day,Requested,Accepted,Reserved,SGM,Rejected,Wallet,Limit,Intervention,ReservedRemaining,BillingDay"
-            ]
-            for d in days_to_show:
-                csv_lines.append(
-                    f"{d.day_index},{d.requested_spend},{d.accepted_spend},"
-                    f"{d.reserved_spend},{d.sgm_spend},{d.rejected_spend},"
-                    f"{d.wallet_balance_end},{d.daily_spend_limit},"
-                    f"{d.intervention_type},{d.reserved_remaining},{d.billing_day}"
-                )
-            csv_data = "\n".join(csv_lines)
+            csv_data = pd.DataFrame(
+                {
+                    "Day": arrs["day_index"],
+                    "Requested": arrs["requested_spend"],
+                    "Accepted": arrs["accepted_spend"],
+                    "Reserved": arrs["reserved_spend"],
+                    "SGM": arrs["sgm_spend"],
+                    "Rejected": arrs["rejected_spend"],
+                    "Wallet": arrs["wallet_balance_end"],
+                    "Limit": arrs["daily_spend_limit"],
+                    "Intervention": arrs["intervention_type"],
+                    "ReservedRemaining": arrs["reserved_remaining"],
+                    "BillingDay": arrs["billing_day"],
+                }
+            ).to_csv(index=False)
             st.download_button(
                 "Download CSV", csv_data, "sgm_simulation.csv", "text/csv"
             )
@@ -4,11 +4,14 @@ Comprehensive test coverage for critical SGM fixes
 Tests all the issues identified in the compliance audit.
 """
 
+import array
 import math
 
+import numpy as np
 import pytest
 
 from sgm_simulator import (
+    BatchedSimulator,
     DayResult,
     ManualAllowance,
     ReservedVolumesConfig,
@@ -17,6 +20,35 @@ from sgm_simulator import (
     WalletConfig,
 )
 
+# Shared configuration; none of these are mutated by the tests
+BASE_RULE = SGMRule(
+    name="20%/week or $20/week",
+    growth_percentage=20.0,
+    min_growth_dollars=20.0,
+    enabled=True,
+)
+WALLET_2X = WalletConfig(model="daily_limit_2x")
+WALLET_3DAY = WalletConfig(model="three_day_budget")
+RESERVED_100 = ReservedVolumesConfig(
+    monthly_volume=100.0, billing_day_start=1, days_in_cycle=30
+)
+
+# Single days that might cause wallet cap violations
+# (initial_wallet, daily_request, manual_allowances)
+WALLET_CAP_SCENARIOS = [
+    (50.0, 100.0, []),  # High initial wallet
+    (
+        10.0,
+        50.0,
+        [ManualAllowance(amount=100.0, created_day=0)],
+    ),  # Large manual allowance
+    (
+        30.0,
+        25.0,
+        [ManualAllowance(amount=75.0, created_day=0)],
+    ),  # Wallet + allowance > cap
+]
+
 
 class TestCriticalFixes:
     """Test all critical fixes from the compliance audit"""
@@ -26,100 +58,50 @@ class TestCriticalFixes:
         Test Fix 1: History tracking should use total accepted spend, not just SGM spend
         This tests the critical bug where reserved volume usage wasn't included in history.
         """
-        rule = SGMRule(
-            name="20%/week or $20/week",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rule = BASE_RULE
 
-        reserved = ReservedVolumesConfig(
-            monthly_volume=100.0, billing_day_start=1, days_in_cycle=30
-        )
-
-        wallet_config = WalletConfig(model="daily_limit_2x")
+        reserved = RESERVED_100
+        wallet_config = WALLET_2X
 
         # Simulate several days where reserved volumes are used
-        accepted_history = []
-        wallet_balance = 0.0
-        cumulative_reserved = 0.0
-        last_recalc_day = 0
-
-        results = []
         daily_requests = [15.0, 15.0, 15.0, 15.0, 15.0, 15.0, 15.0, 25.0]  # 8 days
 
-        baseline_spend = None
-        for day_index, request in enumerate(daily_requests):
-            result, last_recalc_day, baseline_spend = SGMEngine.simulate_day(
-                day_index=day_index,
-                billing_day=day_index + 1,
-                requested_spend=request,
-                wallet_balance=wallet_balance,
-                accepted_history=accepted_history,
-                rule=rule,
-                wallet_config=wallet_config,
-                reserved_config=reserved,
-                cumulative_reserved_used=cumulative_reserved,
-                manual_allowances=[],
-                last_recalc_day=last_recalc_day,
-                baseline_spend=baseline_spend,
-            )
-
-            results.append(result)
-
-            # CRITICAL: Verify history includes total accepted spend (reserved + SGM)
-            accepted_history.append(result.accepted_spend)  # This is the fix
-            wallet_balance = result.wallet_balance_end
-            cumulative_reserved = result.cumulative_reserved_used
+        # CRITICAL: the simulator feeds total accepted spend (reserved + SGM)
+        # back into the history, which is the fix under test
+        sim = BatchedSimulator(
+            rule, wallet_config=wallet_config, reserved_config=reserved
+        )
+        sim.run(daily_requests)
 
         # Verify that the algorithm considers total spend (reserved + SGM) for future calculations
         # Day 7 (PRFAQ algorithm) should use history that includes reserved volume usage
-        day7_result = results[7]  # Day 8 (0-indexed 7)
+        day7_limit = sim.daily_limit[7]  # Day 8 (0-indexed 7)
 
         # Calculate what the limit should be based on total accepted history
-        total_history = [r.accepted_spend for r in results[:7]]
-        expected_recent_7 = sum(total_history)
+        total_history = sim.accepted[:7]
+        expected_recent_7 = total_history.sum()
 
         # Verify the daily limit calculation used the correct history
         # This would be wrong if only SGM spend was tracked
         assert expected_recent_7 == 15.0 * 7  # All requests accepted via reserved + SGM
-        assert day7_result.daily_spend_limit > 0  # Should have reasonable limit
+        assert day7_limit > 0  # Should have reasonable limit
 
         # The bug would cause incorrect daily limits because reserved spend wouldn't be counted
-        print(f"Day 7 daily limit: {day7_result.daily_spend_limit}")
-        print(f"Total history sum: {sum(total_history)}")
+        print(f"Day 7 daily limit: {day7_limit}")
+        print(f"Total history sum: {expected_recent_7}")
 
     def test_fix2_wallet_cap_never_violated(self):
         """
         Test Fix 2: Wallet cap should never be violated during calculations
         PRD requirement: wallet "can never exceed the max weekly spend growth"
         """
-        rule = SGMRule(
-            name="20%/week or $20/week",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rule = BASE_RULE
 
-        wallet_config = WalletConfig(model="daily_limit_2x")
+        wallet_config = WALLET_2X
 
         # Test with various scenarios that might cause wallet cap violations
-        test_scenarios = [
-            # (initial_wallet, daily_request, manual_allowances)
-            (50.0, 100.0, []),  # High initial wallet
-            (
-                10.0,
-                50.0,
-                [ManualAllowance(amount=100.0, created_day=0)],
-            ),  # Large manual allowance
-            (
-                30.0,
-                25.0,
-                [ManualAllowance(amount=75.0, created_day=0)],
-            ),  # Wallet + allowance > cap
-        ]
-
-        for initial_wallet, request, manual_allowances in test_scenarios:
+        diagnostics = []
+        for initial_wallet, request, manual_allowances in WALLET_CAP_SCENARIOS:
             # Set up history for PRFAQ algorithm
             accepted_history = [10.0] * 7  # 7 days of $10 each
 
@@ -146,28 +128,48 @@ class TestCriticalFixes:
             # Additional check: wallet should never temporarily exceed capacity during calculations
             # This is enforced by the implementation using min() operations
 
-            print(
+            diagnostics.append(
                 f"Scenario: wallet={initial_wallet}, request={request}, manual={len(manual_allowances)}"
             )
-            print(
+            diagnostics.append(
                 f"  Capacity: {max_capacity}, Start: {result.wallet_balance_start}, End: {result.wallet_balance_end}"
             )
 
+        print("\n".join(diagnostics))
+
+    def test_fix2_wallet_cap_across_scenarios(self):
+        """
+        Test Fix 2 through simulate_day_scenarios: the wallet cap holds for every
+        scenario when the independent days are simulated in one call
+        """
+        initial_wallets, requests, manual_allowances = zip(*WALLET_CAP_SCENARIOS)
+
+        # Same 7 days of $10 history for the PRFAQ algorithm in every scenario
+        scenarios = SGMEngine.simulate_day_scenarios(
+            day_index=7,
+            billing_day=8,
+            requested_spend=requests,
+            wallet_balance=initial_wallets,
+            accepted_history=[10.0] * 7,
+            rule=BASE_RULE,
+            wallet_config=WALLET_2X,
+            manual_allowances=list(manual_allowances),
+        )
+
+        max_capacity = scenarios["wallet_max_capacity"]
+        assert np.all(scenarios["wallet_balance_start"] <= max_capacity)
+        assert np.all(scenarios["wallet_balance_end"] <= max_capacity)
+
     def test_fix3_wallet_capacity_models_compliance(self):
         """
         Test Fix 3: Wallet capacity alignment with PRD requirements
         PRD specifies "max of a 3 day budget" vs PRFAQ "2x daily limit"
         """
-        rule = SGMRule(
-            name="20%/week or $20/week",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rule = BASE_RULE
 
         # Test both capacity models
-        wallet_2x = WalletConfig(model="daily_limit_2x")
-        wallet_3day = WalletConfig(model="three_day_budget")
+        wallet_2x = WALLET_2X
+        wallet_3day = WALLET_3DAY
 
         accepted_history = [15.0] * 7  # Establish history for consistent daily limit
 
@@ -212,12 +214,7 @@ class TestCriticalFixes:
         Test Feature 1: Manual allowance expiration support
         PRD requirement: "Allowances should expire at some point [TBD]"
         """
-        rule = SGMRule(
-            name="20%/week or $20/week",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rule = BASE_RULE
 
         # Create allowances with different expiration settings
         allowances = [
@@ -237,6 +234,22 @@ class TestCriticalFixes:
         # Test various days to check expiration behavior
         test_days = [0, 1, 2, 3, 4, 5, 6, 7, 8]
 
+        # Active/expired totals for every test day in one call
+        active_totals, expired_totals = (
+            SGMEngine.calculate_manual_allowance_schedule(allowances, len(test_days))
+        )
+
+        # All allowances should be active before day 3
+        assert np.all(active_totals[:3] == 105.0)  # 50 + 30 + 25
+        assert np.all(expired_totals[:3] == 0.0)
+        # First allowance expires on day 3
+        assert active_totals[3] == 55.0  # 30 + 25 (short term expired)
+        assert expired_totals[3] == 50.0
+        # Medium term allowance also expires (created day 2 + 5 days = day 7)
+        assert np.all(active_totals[7:] == 30.0)  # Only permanent remains
+        assert np.all(expired_totals[7:] == 75.0)  # 50 + 25
+
+        diagnostics = []
         for day in test_days:
             result, _, _ = SGMEngine.simulate_day(
                 day_index=day,
@@ -248,28 +261,41 @@ class TestCriticalFixes:
                 manual_allowances=allowances,
             )
 
-            # Check expiration logic
-            active_total, expired_total = SGMEngine.calculate_active_manual_allowances(
-                allowances, day
-            )
+            # The simulated day sees the same expired total as the schedule
+            assert result.expired_allowances == expired_totals[day]
 
-            if day < 3:
-                # All allowances should be active
-                assert active_total == 105.0  # 50 + 30 + 25
-                assert expired_total == 0.0
-            elif day == 3:
-                # First allowance expires
-                assert active_total == 55.0  # 30 + 25 (short term expired)
-                assert expired_total == 50.0
-            elif day >= 7:
-                # Medium term allowance also expires (created day 2 + 5 days = day 7)
-                assert active_total == 30.0  # Only permanent remains
-                assert expired_total == 75.0  # 50 + 25
-
-            print(
-                f"Day {day}: Active={active_total}, Expired={expired_total}, Used={result.manual_allowances_used}"
+            diagnostics.append(
+                f"Day {day}: Active={active_totals[day]}, Expired={expired_totals[day]}, Used={result.manual_allowances_used}"
             )
 
+        print("\n".join(diagnostics))
+
+    def test_feature1_manual_allowance_arrays(self):
+        """
+        Test Feature 1: Allowance arrays use -1 for allowances that never expire
+        """
+        allowances = [
+            ManualAllowance(amount=50.0, created_day=0, expiration_days=3),
+            ManualAllowance(amount=30.0, created_day=0, expiration_days=None),
+            ManualAllowance(amount=25.0, created_day=2, expiration_days=5),
+        ]
+
+        amounts, created_days, expiration_days = ManualAllowance.to_arrays(allowances)
+
+        assert list(amounts) == [50.0, 30.0, 25.0]
+        assert list(created_days) == [0, 0, 2]
+        assert list(expiration_days) == [3, -1, 5]
+
+        # The packed record array carries the same fields
+        records = ManualAllowance.batch(allowances)
+        assert records.dtype.names == ("amount", "created", "exp")
+        assert list(records["exp"]) == [3, -1, 5]
+
+        # Empty list converts to empty arrays with no allowance totals
+        empty = ManualAllowance.to_arrays([])
+        assert all(len(column) == 0 for column in empty)
+        assert SGMEngine.calculate_active_manual_allowances([], 5) == (0.0, 0.0)
+
     def test_feature2_weekly_recalculation_timing(self):
         """
         Test Feature 2: Weekly recalculation timing
@@ -284,9 +310,13 @@ class TestCriticalFixes:
             weekly_recalc_day=1,  # Tuesday (0=Monday, 1=Tuesday, etc.)
         )
 
-        accepted_history = [10.0] * 7  # Initial history
+        accepted_history = array.array("d", [10.0] * 7)  # Initial history
         last_recalc_day = 0
 
+        # Tuesdays once enough time has passed since the last recalculation
+        recalc_days = SGMEngine.recalc_schedule(rule, 21)
+        assert list(np.flatnonzero(recalc_days)) == [8, 15]
+
         # Simulate 21 days (3 weeks) to test recalculation timing
         baseline_spend = None
         for day in range(21):
@@ -297,14 +327,8 @@ class TestCriticalFixes:
             )
 
             # Check if recalculation occurred
-            weekday = day % 7
-            days_since_last = day - last_recalc_day
-
-            if (
-                day >= 7 and weekday == 1 and days_since_last >= 7
-            ):  # Tuesday and enough time passed
+            if recalc_days[day]:
                 assert new_last_recalc_day == day, f"Should recalculate on day {day}"
-                print(f"Recalculation on day {day} (Tuesday)")
             else:
                 assert (
                     new_last_recalc_day == last_recalc_day
@@ -315,6 +339,8 @@ class TestCriticalFixes:
             # Add to history for next iteration
             accepted_history.append(10.0)
 
+        print(f"Recalculation days (Tuesday): {np.flatnonzero(recalc_days).tolist()}")
+
     def test_comprehensive_integration(self):
         """
         Integration test combining all fixes and features
@@ -328,7 +354,7 @@ class TestCriticalFixes:
             weekly_recalc_day=0,  # Monday
         )
 
-        wallet_config = WalletConfig(model="three_day_budget")
+        wallet_config = WALLET_3DAY
 
         reserved = ReservedVolumesConfig(
             monthly_volume=200.0, billing_day_start=1, days_in_cycle=30
@@ -348,85 +374,57 @@ class TestCriticalFixes:
         ]
 
         # Simulate 30 days
-        accepted_history = []
-        wallet_balance = 0.0
-        cumulative_reserved = 0.0
-        last_recalc_day = 0
-        results = []
-
         daily_pattern = [20.0, 25.0, 30.0, 15.0, 40.0] * 6  # Varying pattern
 
-        baseline_spend = None
-        for day_index, request in enumerate(daily_pattern):
-            result, last_recalc_day, baseline_spend = SGMEngine.simulate_day(
-                day_index=day_index,
-                billing_day=(day_index % 30) + 1,
-                requested_spend=request,
-                wallet_balance=wallet_balance,
-                accepted_history=accepted_history,
-                rule=rule,
-                wallet_config=wallet_config,
-                reserved_config=reserved,
-                cumulative_reserved_used=cumulative_reserved,
-                manual_allowances=manual_allowances,
-                last_recalc_day=last_recalc_day,
-                baseline_spend=baseline_spend,
-            )
-
-            results.append(result)
-
-            # Validate all fixes
-            # Fix 1: History tracking
-            accepted_history.append(result.accepted_spend)  # Total spend
+        sim = BatchedSimulator(
+            rule,
+            wallet_config=wallet_config,
+            reserved_config=reserved,
+            manual_allowances=manual_allowances,
+        )
+        days = sim.run(daily_pattern)
+        wallet_end = sim.wallet_end
+        wallet_capacity = days["wallet_max_capacity"]
 
-            # Fix 2: Wallet cap
-            assert result.wallet_balance_end <= result.wallet_max_capacity
+        # Validate all fixes
+        # Fix 1: History tracking (the simulator records total accepted spend)
 
-            # Fix 3: Wallet capacity model
-            if len(accepted_history) >= 7:
-                expected_capacity = result.daily_spend_limit * 3.0  # three_day_budget
-                assert abs(result.wallet_max_capacity - expected_capacity) < 0.01
+        # Fix 2: Wallet cap
+        assert np.all(wallet_end <= wallet_capacity)
 
-            # Feature 1: Manual allowance expiration
-            if day_index >= 15:  # After campaign expires (day 5 + 10)
-                assert result.expired_allowances >= 100.0
+        # Fix 3: Wallet capacity model, once 7 days of history are recorded
+        expected_capacity = sim.daily_limit[6:] * 3.0  # three_day_budget
+        assert np.allclose(wallet_capacity[6:], expected_capacity, rtol=0, atol=0.01)
 
-            # Update state
-            wallet_balance = result.wallet_balance_end
-            cumulative_reserved = result.cumulative_reserved_used
+        # Feature 1: Manual allowance expiration
+        # After campaign expires (day 5 + 10)
+        assert np.all(days["expired_allowances"][15:] >= 100.0)
 
         # Verify overall behavior
-        total_requested = sum(r.requested_spend for r in results)
-        total_accepted = sum(r.accepted_spend for r in results)
+        total_requested = days["requested_spend"].sum()
+        total_accepted = sim.accepted.sum()
         acceptance_rate = total_accepted / total_requested
 
         assert acceptance_rate > 0.8, f"Poor acceptance rate: {acceptance_rate}"
 
         # Check no critical violations
-        wallet_violations = [
-            r for r in results if r.wallet_balance_end > r.wallet_max_capacity + 0.01
-        ]
-        assert (
-            len(wallet_violations) == 0
-        ), f"Wallet violations: {len(wallet_violations)}"
+        wallet_violations = wallet_end > wallet_capacity + 0.01
+        assert not np.any(
+            wallet_violations
+        ), f"Wallet violations: {np.count_nonzero(wallet_violations)}"
 
         print(
-            f"Integration test passed: {len(results)} days, {acceptance_rate:.1%} acceptance"
+            f"Integration test passed: {len(wallet_end)} days, {acceptance_rate:.1%} acceptance"
         )
 
     def test_regression_prevention(self):
         """
         Regression test to ensure fixes don't break existing functionality
         """
-        rule = SGMRule(
-            name="20%/week or $20/week",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rule = BASE_RULE
 
         # Test bootstrap period (days 0-6)
-        accepted_history = []
+        accepted_history = array.array("d")
 
         for day in range(7):
             daily_limit, _, _ = SGMEngine.calculate_daily_spend_limit(
@@ -444,16 +442,13 @@ class TestCriticalFixes:
             accepted_history.append(12.0)  # Slight growth
 
         # Verify growth limits are reasonable
-        recent_limits = []
-        for day in range(10, 14):
-            limit, _, _ = SGMEngine.calculate_daily_spend_limit(
-                accepted_history[:day], rule, day, 0
-            )
-            recent_limits.append(limit)
+        recent_limits = SGMEngine.calculate_rolling_limits(
+            accepted_history, rule, range(10, 14)
+        )
 
         # Should allow some growth but not be excessive
-        assert max(recent_limits) < 30.0, "Limits too high"
-        assert min(recent_limits) > 1.0, "Limits too low"
+        assert recent_limits.max() < 30.0, "Limits too high"
+        assert recent_limits.min() > 1.0, "Limits too low"
 
         print("Regression tests passed")
 
@@ -5,446 +5,500 @@ Tests realistic business patterns and use cases
 """
 
 import math
+from dataclasses import dataclass
+from functools import cache
 
+import numpy as np
 import pytest
 
-from sgm_simulator import ReservedVolumesConfig, SGMEngine, SGMRule
+from sgm_simulator import (
+    BatchedSimulator,
+    InterventionType,
+    ReservedVolumesConfig,
+    SGMRule,
+)
+
+# Weekly patterns repeat every 7 days, so one value per weekday covers any range
+_WEEKLY_SIN = tuple(math.sin(2 * math.pi * k / 7) for k in range(7))
+_WEEKDAY_FACTOR = tuple(1.1 if k < 5 else 0.8 for k in range(7))
+
+# Loop-invariant scenario levels
+_VIRAL_PLATEAU_BASE = 25.0 * (3**5) * 0.8  # = 4860.0
+_PANDEMIC_SURGE_BASE = 40.0 * (1.15**15)  # Level after early pandemic growth
+_PANDEMIC_PLATEAU_BASE = _PANDEMIC_SURGE_BASE * (1.3**15) * 0.8
+
+
+# Scenario configs are never mutated by the engine, so build them once
+_SAAS_RULE = SGMRule(
+    name="30%/week or $30/week",
+    growth_percentage=30.0,
+    min_growth_dollars=30.0,
+    enabled=True,
+)
+
+_SAAS_RESERVED = ReservedVolumesConfig(
+    monthly_volume=300.0, billing_day_start=1, days_in_cycle=30
+)
+
+_ECOMMERCE_RULE = SGMRule(
+    name="25%/week or $50/week",
+    growth_percentage=25.0,
+    min_growth_dollars=50.0,
+    enabled=True,
+)
+
+_ECOMMERCE_RESERVED = ReservedVolumesConfig(
+    monthly_volume=800.0,  # Higher reserved for holiday season
+    billing_day_start=1,
+    days_in_cycle=30,
+)
+
+_GAMING_RULE = SGMRule(
+    name="50%/week or $100/week",  # Aggressive for viral growth
+    growth_percentage=50.0,
+    min_growth_dollars=100.0,
+    enabled=True,
+)
+
+_FINTECH_RULE = SGMRule(
+    name="15%/week or $25/week",  # Conservative for regulated industry
+    growth_percentage=15.0,
+    min_growth_dollars=25.0,
+    enabled=True,
+)
+
+_FINTECH_RESERVED = ReservedVolumesConfig(
+    monthly_volume=400.0, billing_day_start=1, days_in_cycle=30
+)
+
+_MEDIA_RULE = SGMRule(
+    name="40%/week or $80/week",
+    growth_percentage=40.0,
+    min_growth_dollars=80.0,
+    enabled=True,
+)
+
+_B2B_RULE = SGMRule(
+    name="20%/week or $40/week",
+    growth_percentage=20.0,
+    min_growth_dollars=40.0,
+    enabled=True,
+)
+
+_B2B_RESERVED = ReservedVolumesConfig(
+    monthly_volume=250.0, billing_day_start=1, days_in_cycle=30
+)
+
+_HEALTHCARE_RULE = SGMRule(
+    name="60%/week or $150/week",  # Very aggressive for healthcare emergency
+    growth_percentage=60.0,
+    min_growth_dollars=150.0,
+    enabled=True,
+    validate_bounds=False,  # Disable validation for business scenario testing
+)
+
+
+@dataclass
+class SimResultsArrays:
+    """Per-day result columns checked by the business scenario tests"""
+
+    daily_spend_limit: np.ndarray
+    accepted_spend: np.ndarray
+    rejected_spend: np.ndarray
+    requested_spend: np.ndarray
+    intervention_type: np.ndarray  # InterventionType codes (int8)
+
+
+def simulate_business_scenario(
+    pattern, rule, reserved_config=None, manual_allowances=None
+):
+    """
+    Helper to simulate business scenarios
+    manual_allowances holds one same-day allowance per day (list or ndarray)
+    """
+    sim = BatchedSimulator(rule, reserved_config=reserved_config)
+    columns = sim.run(pattern, manual_allowances)
+    return SimResultsArrays(
+        daily_spend_limit=columns["daily_spend_limit"],
+        accepted_spend=columns["accepted_spend"],
+        rejected_spend=columns["rejected_spend"],
+        requested_spend=columns["requested_spend"],
+        intervention_type=sim.intervention_codes,
+    )
+
+
+@cache
+def _saas_pattern():
+    """Daily requested spend for the SaaS scenario"""
+    # SaaS pattern: steady growth with month-end spikes (billing)
+    base_daily = 15.0
+    days = np.arange(90)  # 3 months
+    monthly_growth = (days // 30) * 0.1  # 10% monthly growth
+    day_of_month = (days % 30) + 1
+
+    # Month-end billing spike
+    billing_multiplier = np.where(day_of_month >= 28, 2.0, 1.0)
+
+    return tuple((base_daily * (1 + monthly_growth) * billing_multiplier).tolist())
+
+
+@pytest.fixture(scope="class")
+def saas_results():
+    """SaaS company with steady subscriber growth"""
+    return simulate_business_scenario(_saas_pattern(), _SAAS_RULE, _SAAS_RESERVED)
+
+
+@cache
+def _ecommerce_pattern():
+    """Daily requested spend for the e-commerce scenario"""
+    # Holiday pattern: October - January
+    # Base traffic -> Black Friday -> Cyber Monday -> Holiday steady -> New Year
+    base = 35.0
+    days = np.arange(120)  # 4 months
+    multiplier = np.select(
+        [
+            days < 30,  # October - normal
+            days < 54,  # November pre-BF
+            days == 54,  # Black Friday
+            days == 57,  # Cyber Monday
+            days < 85,  # December holiday shopping
+            days < 90,  # Week between Christmas and New Year
+            days == 92,  # New Year's Day
+        ],
+        [1.0, 1.2, 4.0, 3.5, 2.2, 1.8, 2.5],
+        default=0.8,  # January recovery
+    )
+
+    return tuple((base * multiplier).tolist())
+
+
+@pytest.fixture(scope="class")
+def ecommerce_results():
+    """E-commerce company during holiday season"""
+    pattern = _ecommerce_pattern()
+
+    # Plan manual allowances for known spikes
+    manual_allowances = np.zeros(120)
+    manual_allowances[54] = 120.0  # Black Friday
+    manual_allowances[57] = 100.0  # Cyber Monday
+    manual_allowances[92] = 60.0  # New Year's
+
+    return simulate_business_scenario(
+        pattern, _ECOMMERCE_RULE, _ECOMMERCE_RESERVED, manual_allowances
+    )
+
+
+@cache
+def _gaming_pattern():
+    """Daily requested spend for the gaming scenario"""
+    # Gaming viral pattern: normal -> viral explosion -> plateau -> decline
+    days = np.arange(90)
+    decline_factor = 1 - ((days - 50) * 0.03)  # 3% daily decline
+    base = np.select(
+        [
+            days < 20,  # Pre-viral
+            days < 25,  # Viral explosion
+            days < 50,  # Viral plateau
+            days < 70,  # Gradual decline
+        ],
+        [
+            25.0,
+            25.0 * 3.0 ** (days - 19),  # Exponential growth
+            _VIRAL_PLATEAU_BASE,  # High but stable
+            _VIRAL_PLATEAU_BASE * decline_factor,
+        ],
+        default=80.0,  # New normal (higher than pre-viral)
+    )
+
+    # Add daily variation
+    variation = 1 + 0.2 * np.take(_WEEKLY_SIN, days % 7)
+    return tuple((base * variation).tolist())
+
+
+@pytest.fixture(scope="class")
+def gaming_results():
+    """Gaming company with viral hit"""
+    return simulate_business_scenario(_gaming_pattern(), _GAMING_RULE)
+
+
+@cache
+def _fintech_pattern():
+    """Daily requested spend for the fintech scenario"""
+    # Fintech pattern: steady base + quarterly compliance spikes + monthly reporting
+    base = 20.0
+    days = np.arange(180)  # 6 months
+
+    # Monthly reporting spike (end of month)
+    day_of_month = (days % 30) + 1
+    monthly_spike = np.where(day_of_month >= 28, 1.5, 1.0)
+
+    # Quarterly compliance spike (end of Q1 and Q2)
+    quarterly_spike = np.where(np.isin(days, [89, 90, 179, 180]), 2.5, 1.0)
+
+    return tuple((base * monthly_spike * quarterly_spike).tolist())
+
+
+@pytest.fixture(scope="class")
+def fintech_results():
+    """Fintech company with regulatory compliance costs"""
+    pattern = _fintech_pattern()
+
+    # Plan for quarterly compliance
+    manual_allowances = np.zeros(180)
+    manual_allowances[89] = 30.0  # Q1 compliance
+    manual_allowances[90] = 25.0
+    manual_allowances[179] = 35.0  # Q2 compliance
+
+    return simulate_business_scenario(
+        pattern, _FINTECH_RULE, _FINTECH_RESERVED, manual_allowances
+    )
+
+
+@cache
+def _media_pattern():
+    """Daily requested spend for the media streaming scenario"""
+    # Live event pattern: normal -> pre-event buildup -> event spike -> post-event
+    base = 50.0
+    days = np.arange(60)
+    multiplier = np.select(
+        [
+            days < 20,  # Normal period
+            days < 25,  # Pre-event buildup
+            days == 25,  # Event day
+            days < 30,  # Event weekend
+            days < 35,  # Post-event high interest
+        ],
+        [1.0, 1 + ((days - 20) * 0.2), 5.0, 3.0, 2.0],  # 20% daily buildup
+        default=1.2,  # Return to a slightly higher new normal
+    )
+
+    return tuple((base * multiplier).tolist())
+
+
+@pytest.fixture(scope="class")
+def media_results():
+    """Media streaming during live events"""
+    pattern = _media_pattern()
+
+    # Plan for event
+    manual_allowances = np.zeros(60)
+    manual_allowances[25] = 200.0  # Event day
+    manual_allowances[26] = 100.0  # Event weekend
+    manual_allowances[27] = 100.0
+
+    return simulate_business_scenario(pattern, _MEDIA_RULE, None, manual_allowances)
+
+
+@cache
+def _b2b_pattern():
+    """Daily requested spend for the B2B scenario"""
+    # B2B pattern: steady base + quarterly sales pushes + end-of-quarter spikes
+    base = 30.0
+    days = np.arange(270)  # 9 months (3 quarters)
+
+    # Quarterly cycle
+    day_in_quarter = days % 90
+    quarterly_factor = np.select(
+        [
+            day_in_quarter < 70,  # Normal sales activity
+            day_in_quarter < 85,  # End-of-quarter push
+        ],
+        [1.0, 1.5],
+        default=2.2,  # Final week rush
+    )
+
+    # Annual growth trend
+    annual_growth = 1 + (days / 365) * 0.2  # 20% annual growth
+
+    return tuple((base * quarterly_factor * annual_growth).tolist())
+
+
+@pytest.fixture(scope="class")
+def b2b_results():
+    """B2B enterprise with quarterly sales cycles"""
+    return simulate_business_scenario(_b2b_pattern(), _B2B_RULE, _B2B_RESERVED)
+
+
+@cache
+def _healthcare_pattern():
+    """Daily requested spend for the healthcare scenario"""
+    # Pandemic pattern: normal -> gradual increase -> exponential surge -> plateau -> new normal
+    days = np.arange(150)  # 5 months
+    base = np.select(
+        [
+            days < 30,  # Pre-pandemic normal
+            days < 45,  # Early pandemic growth
+            days < 60,  # Exponential surge
+            days < 100,  # High plateau
+        ],
+        [
+            40.0,
+            40.0 * 1.15 ** (days - 30),  # 15% daily growth
+            _PANDEMIC_SURGE_BASE * 1.3 ** (days - 45),  # 30% daily growth
+            _PANDEMIC_PLATEAU_BASE,  # Stable high level
+        ],
+        default=200.0,  # New normal (much higher than pre-pandemic)
+    )
+
+    # Weekly patterns (higher weekdays, lower weekends)
+    weekly_factor = np.take(_WEEKDAY_FACTOR, days % 7)
+
+    return tuple((base * weekly_factor).tolist())
+
+
+@pytest.fixture(scope="class")
+def healthcare_results():
+    """Healthcare telemedicine during pandemic surge"""
+    pattern = _healthcare_pattern()
+
+    # Emergency manual allowances during surge
+    manual_allowances = np.zeros(150)
+    manual_allowances[45:70] = 200.0  # During surge period
+
+    return simulate_business_scenario(
+        pattern, _HEALTHCARE_RULE, None, manual_allowances
+    )
 
 
 class TestSGMBusinessScenarios:
     """Business scenario tests for real-world usage patterns"""
 
-    def simulate_business_scenario(
-        self, pattern, rule, reserved_config=None, manual_allowances=None
-    ):
-        """Helper to simulate business scenarios"""
-        accepted_history = []
-        wallet_balance = 0.0
-        cumulative_reserved = 0.0
-        results = []
-
-        manual_allowances = manual_allowances or [0.0] * len(pattern)
-
-        for day, request in enumerate(pattern):
-            billing_day = (
-                day % (reserved_config.days_in_cycle if reserved_config else 30)
-            ) + 1
-
-            if reserved_config and billing_day == 1 and day > 0:
-                cumulative_reserved = 0.0
-
-            result, _, _ = SGMEngine.simulate_day(
-                day_index=day,
-                billing_day=billing_day,
-                requested_spend=request,
-                wallet_balance=wallet_balance,
-                accepted_history=accepted_history,
-                rule=rule,
-                reserved_config=reserved_config,
-                cumulative_reserved_used=cumulative_reserved,
-                manual_allowance=manual_allowances[day],
-            )
-
-            accepted_history.append(result.accepted_spend)
-            wallet_balance = result.wallet_balance_end
-            cumulative_reserved = result.cumulative_reserved_used
-            results.append(result)
-
-        return results
-
-    def test_saas_company_growth(self):
-        """Test SaaS company with steady subscriber growth"""
-        rule = SGMRule(
-            name="30%/week or $30/week",
-            growth_percentage=30.0,
-            min_growth_dollars=30.0,
-            enabled=True,
-        )
-
-        reserved = ReservedVolumesConfig(
-            monthly_volume=300.0, billing_day_start=1, days_in_cycle=30
-        )
-
-        # SaaS pattern: steady growth with month-end spikes (billing)
-        pattern = []
-        base_daily = 15.0
-
-        for day in range(90):  # 3 months
-            monthly_growth = (day // 30) * 0.1  # 10% monthly growth
-            day_of_month = (day % 30) + 1
-
-            # Month-end billing spike
-            if day_of_month >= 28:
-                billing_multiplier = 2.0
-            else:
-                billing_multiplier = 1.0
-
-            daily_spend = base_daily * (1 + monthly_growth) * billing_multiplier
-            pattern.append(daily_spend)
-
-        results = self.simulate_business_scenario(pattern, rule, reserved)
-
+    def test_saas_month_end_handling(self, saas_results):
+        """Test SaaS month-end billing spikes are mostly accepted"""
         # Check month-end handling
-        month_ends = [results[i] for i in [27, 28, 29, 57, 58, 59, 87, 88, 89]]
-        for r in month_ends:
-            # Should handle billing spikes with minimal rejections
-            if r.rejected_spend > 0:
-                rejection_rate = r.rejected_spend / r.requested_spend
-                assert rejection_rate < 0.4  # Allow up to 40% rejection during spikes
+        month_ends = [27, 28, 29, 57, 58, 59, 87, 88, 89]
+        rejected = saas_results.rejected_spend[month_ends]
+        requested = saas_results.requested_spend[month_ends]
+
+        # Should handle billing spikes with minimal rejections
+        mask = rejected > 0
+        rates = rejected[mask] / requested[mask]
+        assert (rates < 0.4).all(), rates  # Allow up to 40% rejection during spikes
+
+    def test_saas_growth_adaptation(self, saas_results):
+        """Test SaaS limits follow monthly subscriber growth"""
+        limits = saas_results.daily_spend_limit
 
         # Check growth adaptation
-        month1_avg = sum(r.daily_spend_limit for r in results[20:30]) / 10
-        month3_avg = sum(r.daily_spend_limit for r in results[80:90]) / 10
+        month1_avg = limits[20:30].mean()
+        month3_avg = limits[80:90].mean()
         assert month3_avg > month1_avg * 1.15  # Reasonable growth adaptation
 
-    def test_ecommerce_holiday_season(self):
-        """Test e-commerce company during holiday season"""
-        rule = SGMRule(
-            name="25%/week or $50/week",
-            growth_percentage=25.0,
-            min_growth_dollars=50.0,
-            enabled=True,
-        )
-
-        reserved = ReservedVolumesConfig(
-            monthly_volume=800.0,  # Higher reserved for holiday season
-            billing_day_start=1,
-            days_in_cycle=30,
-        )
-
-        # Holiday pattern: October - January
-        # Base traffic -> Black Friday -> Cyber Monday -> Holiday steady -> New Year
-        pattern = []
-        for day in range(120):  # 4 months
-            base = 35.0
-
-            if day < 30:  # October - normal
-                multiplier = 1.0
-            elif day < 54:  # November pre-BF
-                multiplier = 1.2
-            elif day == 54:  # Black Friday
-                multiplier = 4.0
-            elif day == 57:  # Cyber Monday
-                multiplier = 3.5
-            elif day < 85:  # December holiday shopping
-                multiplier = 2.2
-            elif day < 90:  # Week between Christmas and New Year
-                multiplier = 1.8
-            elif day == 92:  # New Year's Day
-                multiplier = 2.5
-            else:  # January recovery
-                multiplier = 0.8
-
-            pattern.append(base * multiplier)
-
-        # Plan manual allowances for known spikes
-        manual_allowances = [0.0] * 120
-        manual_allowances[54] = 120.0  # Black Friday
-        manual_allowances[57] = 100.0  # Cyber Monday
-        manual_allowances[92] = 60.0  # New Year's
-
-        results = self.simulate_business_scenario(
-            pattern, rule, reserved, manual_allowances
-        )
-
+    def test_ecommerce_black_friday(self, ecommerce_results):
+        """Test planned allowances cover the Black Friday spike"""
         # Black Friday should be handled well
-        bf_result = results[54]
-        assert bf_result.accepted_spend > 120.0  # Should accept significant amount
-        assert bf_result.rejected_spend < 20.0  # Minimal rejections with planning
+        # Should accept significant amount, with minimal rejections with planning
+        assert ecommerce_results.accepted_spend[54] > 120.0
+        assert ecommerce_results.rejected_spend[54] < 20.0
 
+    def test_ecommerce_holiday_adaptation(self, ecommerce_results):
+        """Test limits adapt to December holiday traffic"""
         # Holiday season should show good adaptation
-        pre_holiday = results[30:54]  # November pre-BF
-        holiday_peak = results[60:85]  # December
-
-        pre_avg_limit = sum(r.daily_spend_limit for r in pre_holiday) / len(pre_holiday)
-        peak_avg_limit = sum(r.daily_spend_limit for r in holiday_peak) / len(
-            holiday_peak
-        )
+        limits = ecommerce_results.daily_spend_limit
+        # November pre-BF vs December
+        pre_avg_limit, peak_avg_limit = limits[30:54].mean(), limits[60:85].mean()
 
         assert peak_avg_limit > pre_avg_limit * 1.5  # Significant adaptation
 
-    def test_gaming_company_viral_hit(self):
-        """Test gaming company with viral hit"""
-        rule = SGMRule(
-            name="50%/week or $100/week",  # Aggressive for viral growth
-            growth_percentage=50.0,
-            min_growth_dollars=100.0,
-            enabled=True,
-        )
-
-        # Gaming viral pattern: normal -> viral explosion -> plateau -> decline
-        pattern = []
-        for day in range(90):
-            if day < 20:  # Pre-viral
-                base = 25.0
-            elif day < 25:  # Viral explosion
-                base = 25.0 * (3 ** (day - 19))  # Exponential growth
-            elif day < 50:  # Viral plateau
-                base = 25.0 * (3**5) * 0.8  # High but stable
-            elif day < 70:  # Gradual decline
-                decline_factor = 1 - ((day - 50) * 0.03)  # 3% daily decline
-                base = 25.0 * (3**5) * 0.8 * decline_factor
-            else:  # New normal (higher than pre-viral)
-                base = 80.0
-
-            # Add daily variation
-            variation = 1 + 0.2 * math.sin(2 * math.pi * day / 7)
-            pattern.append(base * variation)
-
-        results = self.simulate_business_scenario(pattern, rule)
-
-        # Viral explosion should trigger interventions initially
-        explosion_period = results[20:25]
-        interventions = [
-            r.intervention_type
-            for r in explosion_period
-            if r.intervention_type != "none"
-        ]
-        assert len(interventions) > 0  # Should see some interventions
+    def test_gaming_viral_explosion_interventions(self, gaming_results):
+        """Test the viral explosion triggers interventions"""
+        # Viral explosion should trigger interventions initially (some days not NONE)
+        explosion_period = gaming_results.intervention_type[20:25]
+        assert bool((explosion_period != InterventionType.NONE).any())
 
+    def test_gaming_plateau_acceptance(self, gaming_results):
+        """Test some spend is accepted during the viral plateau"""
         # But system should show some adaptation during plateau
-        plateau_period = results[30:40]
-        plateau_rejections = sum(r.rejected_spend for r in plateau_period)
-        plateau_requests = sum(r.requested_spend for r in plateau_period)
+        plateau_rejections = gaming_results.rejected_spend[30:40].sum()
+        plateau_requests = gaming_results.requested_spend[30:40].sum()
         plateau_acceptance = 1 - (plateau_rejections / plateau_requests)
         # With extreme viral growth, even aggressive SGM needs time to adapt
         assert plateau_acceptance > 0.01  # Some acceptance during plateau
 
+    def test_gaming_new_normal(self, gaming_results):
+        """Test post-viral limits settle well above pre-viral levels"""
+        limits = gaming_results.daily_spend_limit
+
         # New normal should be much higher than pre-viral
-        pre_viral_limit = sum(r.daily_spend_limit for r in results[15:20]) / 5
-        new_normal_limit = sum(r.daily_spend_limit for r in results[85:90]) / 5
+        pre_viral_limit = limits[15:20].mean()
+        new_normal_limit = limits[85:90].mean()
         assert new_normal_limit > pre_viral_limit * 2
 
-    def test_fintech_regulatory_compliance(self):
-        """Test fintech company with regulatory compliance costs"""
-        rule = SGMRule(
-            name="15%/week or $25/week",  # Conservative for regulated industry
-            growth_percentage=15.0,
-            min_growth_dollars=25.0,
-            enabled=True,
-        )
-
-        reserved = ReservedVolumesConfig(
-            monthly_volume=400.0, billing_day_start=1, days_in_cycle=30
-        )
-
-        # Fintech pattern: steady base + quarterly compliance spikes + monthly reporting
-        pattern = []
-        for day in range(180):  # 6 months
-            base = 20.0
-
-            # Monthly reporting spike (end of month)
-            day_of_month = (day % 30) + 1
-            if day_of_month >= 28:
-                monthly_spike = 1.5
-            else:
-                monthly_spike = 1.0
-
-            # Quarterly compliance spike (end of quarter)
-            if day in [89, 90, 179, 180]:  # End of Q1 and Q2
-                quarterly_spike = 2.5
-            else:
-                quarterly_spike = 1.0
-
-            pattern.append(base * monthly_spike * quarterly_spike)
-
-        # Plan for quarterly compliance
-        manual_allowances = [0.0] * 180
-        manual_allowances[89] = 30.0  # Q1 compliance
-        manual_allowances[90] = 25.0
-        manual_allowances[179] = 35.0  # Q2 compliance
-
-        results = self.simulate_business_scenario(
-            pattern, rule, reserved, manual_allowances
-        )
-
-        # Compliance periods should be handled well
-        q1_compliance = results[89:91]
-        q2_compliance = results[179:180]
-
-        for period in [q1_compliance, q2_compliance]:
-            for r in period:
-                assert (
-                    r.rejected_spend < 15.0
-                )  # Allow reasonable rejections during compliance spikes
+    @pytest.mark.slow
+    def test_fintech_compliance_spikes(self, fintech_results):
+        """Test quarterly compliance spikes are handled with planned allowances"""
+        # Compliance periods (end of Q1 and Q2) should be handled well
+        compliance_days = [89, 90, 179]
+        rejected = fintech_results.rejected_spend[compliance_days]
 
+        # Allow reasonable rejections during compliance spikes
+        assert (rejected < 15.0).all(), rejected
+
+    @pytest.mark.slow
+    def test_fintech_conservative_growth(self, fintech_results):
+        """Test fintech limits grow conservatively over six months"""
         # Should maintain conservative growth (or at least stability)
-        month1_limit = sum(r.daily_spend_limit for r in results[20:30]) / 10
-        month6_limit = sum(r.daily_spend_limit for r in results[170:180]) / 10
+        limits = fintech_results.daily_spend_limit
+        month1_limit = limits[20:30].mean()
+        month6_limit = limits[170:180].mean()
         growth_ratio = month6_limit / month1_limit
-        assert 0.9 < growth_ratio < 2.0  # Conservative growth or stability
-
-    def test_media_streaming_live_event(self):
-        """Test media streaming during live events"""
-        rule = SGMRule(
-            name="40%/week or $80/week",
-            growth_percentage=40.0,
-            min_growth_dollars=80.0,
-            enabled=True,
-        )
-
-        # Live event pattern: normal -> pre-event buildup -> event spike -> post-event
-        pattern = []
-        for day in range(60):
-            base = 50.0
-
-            if day < 20:  # Normal period
-                multiplier = 1.0
-            elif day < 25:  # Pre-event buildup
-                multiplier = 1 + ((day - 20) * 0.2)  # 20% daily increase
-            elif day == 25:  # Event day
-                multiplier = 5.0
-            elif day < 30:  # Event weekend
-                multiplier = 3.0
-            elif day < 35:  # Post-event high interest
-                multiplier = 2.0
-            else:  # Return to normal
-                multiplier = 1.2  # Slightly higher new normal
-
-            pattern.append(base * multiplier)
-
-        # Plan for event
-        manual_allowances = [0.0] * 60
-        manual_allowances[25] = 200.0  # Event day
-        manual_allowances[26] = 100.0  # Event weekend
-        manual_allowances[27] = 100.0
-
-        results = self.simulate_business_scenario(
-            pattern, rule, None, manual_allowances
-        )
+        # Conservative growth or stability: a ratio between 0.9 and 2.0
+        assert growth_ratio == pytest.approx(1.45, abs=0.55)
 
+    def test_media_event_day(self, media_results):
+        """Test the live event day is handled with planned allowances"""
         # Event day should be handled successfully
-        event_day = results[25]
-        assert event_day.accepted_spend > 200.0  # Should accept significant traffic
-        assert event_day.rejected_spend < 50.0  # Minimal rejections
+        assert media_results.accepted_spend[25] > 200.0  # Significant traffic
+        assert media_results.rejected_spend[25] < 50.0  # Minimal rejections
 
+    def test_media_new_baseline(self, media_results):
+        """Test limits settle at a higher post-event baseline"""
         # System should adapt quickly to new baseline
-        new_normal = results[40:50]
-        old_normal = results[10:20]
-
-        new_avg_limit = sum(r.daily_spend_limit for r in new_normal) / len(new_normal)
-        old_avg_limit = sum(r.daily_spend_limit for r in old_normal) / len(old_normal)
+        limits = media_results.daily_spend_limit
+        new_avg_limit, old_avg_limit = limits[40:50].mean(), limits[10:20].mean()
 
         assert new_avg_limit > old_avg_limit * 1.3  # Higher post-event baseline
 
-    def test_b2b_enterprise_sales_cycles(self):
-        """Test B2B enterprise with quarterly sales cycles"""
-        rule = SGMRule(
-            name="20%/week or $40/week",
-            growth_percentage=20.0,
-            min_growth_dollars=40.0,
-            enabled=True,
-        )
-
-        reserved = ReservedVolumesConfig(
-            monthly_volume=250.0, billing_day_start=1, days_in_cycle=30
-        )
-
-        # B2B pattern: steady base + quarterly sales pushes + end-of-quarter spikes
-        pattern = []
-        for day in range(270):  # 9 months (3 quarters)
-            base = 30.0
-
-            # Quarterly cycle
-            day_in_quarter = day % 90
-
-            if day_in_quarter < 70:  # Normal sales activity
-                quarterly_factor = 1.0
-            elif day_in_quarter < 85:  # End-of-quarter push
-                quarterly_factor = 1.5
-            else:  # Final week rush
-                quarterly_factor = 2.2
-
-            # Annual growth trend
-            annual_growth = 1 + (day / 365) * 0.2  # 20% annual growth
-
-            pattern.append(base * quarterly_factor * annual_growth)
-
-        results = self.simulate_business_scenario(pattern, rule, reserved)
-
-        # Check quarterly patterns
-        q1_end = results[85:90]
-        q2_end = results[175:180]
-        q3_end = results[265:270]
+    @pytest.mark.slow
+    @pytest.mark.parametrize("quarter", [0, 1, 2])
+    def test_b2b_quarter_end_handling(self, b2b_results, quarter):
+        """Test each end-of-quarter rush is mostly accepted"""
+        # Check quarterly patterns: final 5 days of the quarter
+        quarter_end = slice(quarter * 90 + 85, quarter * 90 + 90)
+        avg_acceptance = b2b_results.accepted_spend[quarter_end].mean()
+        avg_request = b2b_results.requested_spend[quarter_end].mean()
 
         # End-of-quarter periods should show higher activity but good handling
-        for quarter_end in [q1_end, q2_end, q3_end]:
-            avg_acceptance = sum(r.accepted_spend for r in quarter_end) / len(
-                quarter_end
-            )
-            avg_request = sum(r.requested_spend for r in quarter_end) / len(quarter_end)
-            acceptance_rate = avg_acceptance / avg_request
-            assert acceptance_rate > 0.8  # Good handling of quarter-end rushes
+        acceptance_rate = avg_acceptance / avg_request
+        assert acceptance_rate > 0.8  # Good handling of quarter-end rushes
 
-        # Should show growth quarter over quarter
-        q1_limits = [r.daily_spend_limit for r in results[20:70]]
-        q3_limits = [r.daily_spend_limit for r in results[200:250]]
+    @pytest.mark.slow
+    def test_b2b_quarterly_growth(self, b2b_results):
+        """Test limits grow from the first to the third quarter"""
+        limits = b2b_results.daily_spend_limit
 
-        q1_avg = sum(q1_limits) / len(q1_limits)
-        q3_avg = sum(q3_limits) / len(q3_limits)
+        # Should show growth quarter over quarter
+        q1_avg = limits[20:70].mean()
+        q3_avg = limits[200:250].mean()
 
         assert q3_avg > q1_avg * 1.05  # Modest growth over 3 quarters
 
-    def test_healthcare_telemedicine_pandemic(self):
-        """Test healthcare telemedicine during pandemic surge"""
-        rule = SGMRule(
-            name="60%/week or $150/week",  # Very aggressive for healthcare emergency
-            growth_percentage=60.0,
-            min_growth_dollars=150.0,
-            enabled=True,
-            validate_bounds=False,  # Disable validation for business scenario testing
-        )
-
-        # Pandemic pattern: normal -> gradual increase -> exponential surge -> plateau -> new normal
-        pattern = []
-        for day in range(150):  # 5 months
-            if day < 30:  # Pre-pandemic normal
-                base = 40.0
-            elif day < 45:  # Early pandemic growth
-                growth_days = day - 30
-                base = 40.0 * (1.15**growth_days)  # 15% daily growth
-            elif day < 60:  # Exponential surge
-                surge_days = day - 45
-                base = 40.0 * (1.15**15) * (1.3**surge_days)  # 30% daily growth
-            elif day < 100:  # High plateau
-                base = 40.0 * (1.15**15) * (1.3**15) * 0.8  # Stable high level
-            else:  # New normal (much higher than pre-pandemic)
-                base = 200.0
-
-            # Weekly patterns (higher weekdays, lower weekends)
-            day_of_week = day % 7
-            if day_of_week < 5:  # Weekdays
-                weekly_factor = 1.1
-            else:  # Weekends
-                weekly_factor = 0.8
-
-            pattern.append(base * weekly_factor)
-
-        # Emergency manual allowances during surge
-        manual_allowances = [0.0] * 150
-        for day in range(45, 70):  # During surge period
-            manual_allowances[day] = 200.0
-
-        results = self.simulate_business_scenario(
-            pattern, rule, None, manual_allowances
-        )
-
+    def test_healthcare_surge_acceptance(self, healthcare_results):
+        """Test some spend is accepted during the pandemic surge"""
         # Surge period should show some handling despite extreme growth
-        surge_period = results[45:65]
-        surge_acceptance = sum(r.accepted_spend for r in surge_period)
-        surge_requests = sum(r.requested_spend for r in surge_period)
+        surge_acceptance = healthcare_results.accepted_spend[45:65].sum()
+        surge_requests = healthcare_results.requested_spend[45:65].sum()
         surge_rate = surge_acceptance / surge_requests
         # With exponential pandemic surge, even aggressive SGM + manual allowances struggle
         assert surge_rate > 0.1  # Some acceptance despite extreme circumstances
 
-        # System should adapt to new normal
-        pre_pandemic = results[20:30]
-        new_normal = results[140:150]
+    def test_healthcare_new_normal(self, healthcare_results):
+        """Test limits adapt to the post-pandemic new normal"""
+        limits = healthcare_results.daily_spend_limit
 
-        pre_avg_limit = sum(r.daily_spend_limit for r in pre_pandemic) / len(
-            pre_pandemic
-        )
-        new_avg_limit = sum(r.daily_spend_limit for r in new_normal) / len(new_normal)
+        # System should adapt to new normal
+        # Pre-pandemic vs new normal
+        pre_avg_limit, new_avg_limit = limits[20:30].mean(), limits[140:150].mean()
 
         assert new_avg_limit > pre_avg_limit * 4  # Massive adaptation for healthcare
 
@@ -4,9 +4,37 @@ Comprehensive scenario tests for SGM simulator
 Tests real-world business patterns and complex usage scenarios
 """
 
+import random
+from dataclasses import fields
+
+import numpy as np
 import pytest
 
-from sgm_simulator import ReservedVolumesConfig, SGMEngine, SGMRule
+from sgm_simulator import (
+    NUMBA_AVAILABLE,
+    DayResult,
+    ReservedVolumesConfig,
+    SGMEngine,
+    SGMRule,
+)
+
+
+@pytest.fixture(scope="module")
+def standard_20pct_rule():
+    """The default 20%/week or $20/week rule shared across scenarios"""
+    return SGMRule(
+        name="20%/week or $20/week",
+        growth_percentage=20.0,
+        min_growth_dollars=20.0,
+        enabled=True,
+    )
+
+
+def _column(results, field):
+    """One DayResult field across all days as a float64 array"""
+    return np.fromiter(
+        (getattr(r, field) for r in results), dtype=np.float64, count=len(results)
+    )
 
 
 class TestSGMComprehensiveScenarios:
@@ -15,34 +43,70 @@ class TestSGMComprehensiveScenarios:
     def simulate_days(
         self, days, daily_requests, rule, reserved_config=None, manual_allowances=None
     ):
-        """Helper to simulate multiple days with optional manual allowances"""
-        accepted_history = []
+        """
+        Helper to simulate multiple days with optional manual allowances
+        Uses the batched engine when Numba compiles its kernels, else the day loop
+        """
+        if NUMBA_AVAILABLE:
+            return self.simulate_days_batched(
+                days, daily_requests, rule, reserved_config, manual_allowances
+            )
+        return self.simulate_days_loop(
+            days, daily_requests, rule, reserved_config, manual_allowances
+        )
+
+    def simulate_days_batched(
+        self, days, daily_requests, rule, reserved_config=None, manual_allowances=None
+    ):
+        """simulate_days through SGMEngine.simulate_range, rebuilt as DayResults"""
+        columns = SGMEngine.simulate_range(
+            daily_requests[:days],
+            rule,
+            reserved_config=reserved_config,
+            daily_allowances=manual_allowances,
+        )
+        return [
+            DayResult(*values)
+            for values in zip(*(columns[f.name].tolist() for f in fields(DayResult)))
+        ]
+
+    def simulate_days_loop(
+        self, days, daily_requests, rule, reserved_config=None, manual_allowances=None
+    ):
+        """simulate_days as one SGMEngine.simulate_day call per day"""
+        # History is preallocated; the engine sees the filled prefix as a view
+        accepted_history = np.zeros(days, dtype=np.float64)
         wallet_balance = 0.0
         cumulative_reserved = 0.0
-        results = []
+        results = [None] * days
+
+        daily_requests = np.asarray(daily_requests, dtype=np.float64)
+        if manual_allowances is None:
+            manual_allowances = np.zeros(days, dtype=np.float64)
+        else:
+            manual_allowances = np.asarray(manual_allowances, dtype=np.float64)
 
-        manual_allowances = manual_allowances or [0.0] * days
+        # Billing day for every simulated day, computed once up front
+        cycle = reserved_config.days_in_cycle if reserved_config else 30
+        billing_days = np.arange(days) % cycle + 1
 
         for day in range(days):
-            # Handle billing day reset for reserved
-            billing_day = (
-                day % (reserved_config.days_in_cycle if reserved_config else 30)
-            ) + 1
+            billing_day = int(billing_days[day])
 
             result, _, _ = SGMEngine.simulate_day(
                 day_index=day,
                 billing_day=billing_day,
-                requested_spend=daily_requests[day],
+                requested_spend=float(daily_requests[day]),
                 wallet_balance=wallet_balance,
-                accepted_history=accepted_history,
+                accepted_history=accepted_history[:day],
                 rule=rule,
                 reserved_config=reserved_config,
                 cumulative_reserved_used=cumulative_reserved,
-                manual_allowance=manual_allowances[day],
+                manual_allowance=float(manual_allowances[day]),
             )
 
             # Update state with total spending (the fix)
-            accepted_history.append(result.accepted_spend)
+            accepted_history[day] = result.accepted_spend
             wallet_balance = result.wallet_balance_end
             cumulative_reserved = result.cumulative_reserved_used
 
@@ -50,19 +114,38 @@ class TestSGMComprehensiveScenarios:
             if reserved_config and billing_day == 1 and day > 0:
                 cumulative_reserved = result.cumulative_reserved_used
 
-            results.append(result)
+            results[day] = result
 
         return results
 
-    def test_black_friday_scenario(self):
-        """Test Black Friday traffic pattern"""
-        rule = SGMRule(
-            name="20%/week or $20/week",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
+    def test_batched_helper_matches_day_loop(self, standard_20pct_rule):
+        """Test both simulate_days paths give the same results"""
+        reserved = ReservedVolumesConfig(
+            monthly_volume=100.0, billing_day_start=1, days_in_cycle=30
         )
+        pattern = [25.0] * 20 + [200.0] * 5 + [30.0] * 20
+        manual_allowances = [0.0] * 22 + [150.0, 180.0] + [0.0] * 21
 
+        batched = self.simulate_days_batched(
+            45, pattern, standard_20pct_rule, reserved, manual_allowances
+        )
+        looped = self.simulate_days_loop(
+            45, pattern, standard_20pct_rule, reserved, manual_allowances
+        )
+
+        assert len(batched) == len(looped) == 45
+        for b, r in zip(batched, looped):
+            assert b.billing_day == r.billing_day
+            assert b.intervention_type == r.intervention_type
+            assert b.accepted_spend == pytest.approx(r.accepted_spend)
+            assert b.daily_spend_limit == pytest.approx(r.daily_spend_limit)
+            assert b.wallet_balance_end == pytest.approx(r.wallet_balance_end)
+            assert b.cumulative_reserved_used == pytest.approx(
+                r.cumulative_reserved_used
+            )
+
+    def test_black_friday_scenario(self, standard_20pct_rule):
+        """Test Black Friday traffic pattern"""
         reserved = ReservedVolumesConfig(
             monthly_volume=500.0,  # Higher reserved for peak season
             billing_day_start=1,
@@ -81,7 +164,9 @@ class TestSGMComprehensiveScenarios:
         # Use manual allowances for known spikes
         manual_allowances = [0.0] * 23 + [150.0, 180.0] + [0.0] * 5
 
-        results = self.simulate_days(30, pattern, rule, reserved, manual_allowances)
+        results = self.simulate_days(
+            30, pattern, standard_20pct_rule, reserved, manual_allowances
+        )
 
         # Check Black Friday handling
         bf_results = results[23:25]  # Black Friday + Cyber Monday
@@ -118,24 +203,22 @@ class TestSGMComprehensiveScenarios:
         )
 
         results = self.simulate_days(30, pattern, rule)
+        limits = _column(results, "daily_spend_limit")
+        accepted = _column(results, "accepted_spend")
+        rejected = _column(results, "rejected_spend")
 
         # Pre-launch should have minimal rejections
-        pre_launch = results[:7]
-        pre_launch_rejected = sum(r.rejected_spend for r in pre_launch)
-        assert pre_launch_rejected < 10.0
+        assert rejected[:7].sum() < 10.0
 
         # Launch spike should be partially rejected but manageable
-        launch_spike = results[7:10]
-        assert all(r.accepted_spend > 0 for r in launch_spike)
+        assert (accepted[7:10] > 0).all()
 
         # Viral growth should show increasing limits
-        viral_growth = results[10:17]
-        assert viral_growth[-1].daily_spend_limit > viral_growth[0].daily_spend_limit
+        viral_growth = limits[10:17]
+        assert viral_growth[-1] > viral_growth[0]
 
         # Final plateau should have stable high limits
-        plateau = results[-5:]
-        plateau_limits = [r.daily_spend_limit for r in plateau]
-        assert max(plateau_limits) - min(plateau_limits) < 15.0  # Reasonably stable
+        assert np.ptp(limits[-5:]) < 15.0  # Reasonably stable
 
     def test_seasonal_business_scenario(self):
         """Test seasonal business with quarterly patterns"""
@@ -149,47 +232,32 @@ class TestSGMComprehensiveScenarios:
 
         # 90-day seasonal pattern (Q1): ramp up to peak mid-quarter, then down
         days = 90
-        pattern = []
-        for day in range(days):
-            # Sine wave pattern with growing amplitude
-            import math
+        t = np.arange(days)
 
-            base = 20 + day * 0.2  # Growing base
-            seasonal = 15 * math.sin(2 * math.pi * day / 30)  # Monthly cycle
-            pattern.append(max(5.0, base + seasonal))
+        # Sine wave pattern with growing amplitude
+        base = 20 + t * 0.2  # Growing base
+        seasonal = 15 * np.sin(2 * np.pi * t / 30)  # Monthly cycle
+        pattern = np.maximum(5.0, base + seasonal).tolist()
 
         results = self.simulate_days(days, pattern, rule)
 
-        # Check that system adapts to seasonal patterns
-        month1 = results[:30]
-        month2 = results[30:60]
-        month3 = results[60:90]
+        # Check that system adapts to seasonal patterns: monthly means in one pass
+        limits = _column(results, "daily_spend_limit")
+        avg_limit_m1, avg_limit_m2, avg_limit_m3 = limits.reshape(3, 30).mean(axis=1)
 
         # Average limits should increase month over month
-        avg_limit_m1 = sum(r.daily_spend_limit for r in month1) / len(month1)
-        avg_limit_m2 = sum(r.daily_spend_limit for r in month2) / len(month2)
-        avg_limit_m3 = sum(r.daily_spend_limit for r in month3) / len(month3)
-
         assert avg_limit_m2 > avg_limit_m1
         assert avg_limit_m3 > avg_limit_m2
 
         # Total rejections should be reasonable
-        total_rejected = sum(r.rejected_spend for r in results)
-        total_requested = sum(r.requested_spend for r in results)
-        rejection_rate = total_rejected / total_requested
-        assert (
-            rejection_rate < 0.5
-        )  # Less than 50% rejection rate for complex seasonal pattern
-
-    def test_maintenance_window_scenario(self):
-        """Test planned maintenance windows with zero traffic"""
-        rule = SGMRule(
-            name="20%/week or $20/week",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rejected = _column(results, "rejected_spend")
+        requested = _column(results, "requested_spend")
+        rejection_rate = rejected.sum() / requested.sum()
+        # Less than 50% rejection rate for complex seasonal pattern
+        assert rejection_rate < 0.5
 
+    def test_maintenance_window_scenario(self, standard_20pct_rule):
+        """Test planned maintenance windows with zero traffic"""
         # Pattern: normal, maintenance window, recovery
         pattern = (
             [30.0] * 10  # Normal operation
@@ -198,26 +266,23 @@ class TestSGMComprehensiveScenarios:
             + [40.0] * 5  # New normal (higher usage)
         )
 
-        results = self.simulate_days(30, pattern, rule)
+        results = self.simulate_days(30, pattern, standard_20pct_rule)
+        limits = _column(results, "daily_spend_limit")
+        accepted = _column(results, "accepted_spend")
+        rejected = _column(results, "rejected_spend")
 
         # Maintenance window should not break the system
-        maintenance = results[10:15]
-        for r in maintenance:
-            assert r.accepted_spend == 0.0
-            assert r.rejected_spend == 0.0
-            assert r.daily_spend_limit > 0  # Limits should remain positive
+        assert (accepted[10:15] == 0.0).all()
+        assert (rejected[10:15] == 0.0).all()
+        assert (limits[10:15] > 0).all()  # Limits should remain positive
 
         # Recovery should be smooth
-        recovery = results[15:25]
-        recovery_rejected = sum(r.rejected_spend for r in recovery)
-        assert (
-            recovery_rejected < 300.0
-        )  # Some rejections expected during recovery phase
+        recovery_rejected = rejected[15:25].sum()
+        assert recovery_rejected < 300.0  # Some rejections expected during recovery
 
         # New normal should achieve higher limits
-        new_normal = results[25:]
-        avg_new_limit = sum(r.daily_spend_limit for r in new_normal) / len(new_normal)
-        pre_maintenance_limit = results[9].daily_spend_limit
+        avg_new_limit = limits[25:].mean()
+        pre_maintenance_limit = limits[9]
         assert avg_new_limit > pre_maintenance_limit
 
     def test_emergency_scaling_scenario(self):
@@ -248,17 +313,13 @@ class TestSGMComprehensiveScenarios:
         assert emergency_day.accepted_spend > 180.0  # Manual + SGM
 
         # Sustained period should adapt quickly with high growth rate
-        sustained = results[8:15]
-        sustained_limits = [r.daily_spend_limit for r in sustained]
+        limits = _column(results, "daily_spend_limit")
+        sustained_limits = limits[8:15]
         assert sustained_limits[-1] > sustained_limits[0] * 2  # Significant growth
 
         # New normal should be much higher than original
-        new_normal = results[-5:]
-        original_normal = results[:5]
-        avg_new = sum(r.daily_spend_limit for r in new_normal) / len(new_normal)
-        avg_original = sum(r.daily_spend_limit for r in original_normal) / len(
-            original_normal
-        )
+        avg_new = limits[-5:].mean()
+        avg_original = limits[:5].mean()
         assert avg_new > avg_original * 3  # At least 3x higher
 
     def test_gradual_business_growth_scenario(self):
@@ -272,52 +333,33 @@ class TestSGMComprehensiveScenarios:
 
         # 6-month gradual growth: 5% monthly growth
         days = 180
-        pattern = []
-        for day in range(days):
-            base_growth = 20 * (1.05 ** (day / 30))  # 5% monthly growth
-            daily_variation = 1 + 0.1 * ((day * 17) % 7 - 3) / 3  # ±10% daily variation
-            pattern.append(base_growth * daily_variation)
+        t = np.arange(days)
+        base_growth = 20 * (1.05 ** (t / 30))  # 5% monthly growth
+        daily_variation = 1 + 0.1 * ((t * 17) % 7 - 3) / 3  # ±10% daily variation
+        pattern = (base_growth * daily_variation).tolist()
 
         results = self.simulate_days(days, pattern, rule)
 
         # Check month-over-month growth in limits
-        monthly_avg_limits = []
-        for month in range(6):
-            start = month * 30
-            end = start + 30
-            month_results = results[start:end]
-            avg_limit = sum(r.daily_spend_limit for r in month_results) / len(
-                month_results
-            )
-            monthly_avg_limits.append(avg_limit)
+        limits = _column(results, "daily_spend_limit")
+        monthly_avg_limits = limits.reshape(6, 30).mean(axis=1)
 
         # Each month should have higher average limits than previous
-        for i in range(1, 6):
-            assert monthly_avg_limits[i] > monthly_avg_limits[i - 1]
+        assert (np.diff(monthly_avg_limits) > 0).all()
 
         # Final month should be significantly higher than first
-        assert (
-            monthly_avg_limits[-1] > monthly_avg_limits[0] * 2.5
-        )  # Significant growth over 6 months
+        # Significant growth over 6 months
+        assert monthly_avg_limits[-1] > monthly_avg_limits[0] * 2.5
 
         # Overall acceptance rate should be good
-        total_accepted = sum(r.accepted_spend for r in results)
-        total_requested = sum(r.requested_spend for r in results)
-        acceptance_rate = total_accepted / total_requested
+        accepted = _column(results, "accepted_spend")
+        requested = _column(results, "requested_spend")
+        acceptance_rate = accepted.sum() / requested.sum()
         assert acceptance_rate > 0.8  # At least 80% acceptance
 
-    def test_microservices_mixed_pattern(self):
+    def test_microservices_mixed_pattern(self, standard_20pct_rule):
         """Test mixed usage pattern like multiple microservices"""
-        rule = SGMRule(
-            name="20%/week or $20/week",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
-
         # Mixed pattern: base load + periodic spikes + random variations
-        import random
-
         random.seed(42)  # Reproducible
 
         pattern = []
@@ -336,14 +378,12 @@ class TestSGMComprehensiveScenarios:
             variation = 1 + 0.4 * (random.random() - 0.5)
             pattern.append(base_load * variation)
 
-        results = self.simulate_days(60, pattern, rule)
+        results = self.simulate_days(60, pattern, standard_20pct_rule)
 
         # System should adapt to mixed patterns
-        week1_limits = [r.daily_spend_limit for r in results[:7]]
-        week8_limits = [r.daily_spend_limit for r in results[49:56]]
-
-        avg_week1 = sum(week1_limits) / len(week1_limits)
-        avg_week8 = sum(week8_limits) / len(week8_limits)
+        limits = _column(results, "daily_spend_limit")
+        avg_week1 = limits[:7].mean()
+        avg_week8 = limits[49:56].mean()
 
         assert avg_week8 > avg_week1 * 1.5  # Significant adaptation
 
@@ -362,39 +402,27 @@ class TestSGMComprehensiveScenarios:
         )
 
         # Pattern: US launch, EU launch (+8 hours), APAC launch (+16 hours)
-        pattern = []
-        for day in range(45):  # 45-day international rollout
-            base = 10 + day * 0.5  # Base growth
-
-            # US market (days 0+)
-            us_contribution = base if day >= 0 else 0
-
-            # EU market (days 15+)
-            eu_contribution = base * 0.8 if day >= 15 else 0
+        t = np.arange(45)  # 45-day international rollout
+        base = 10 + t * 0.5  # Base growth
 
-            # APAC market (days 30+)
-            apac_contribution = base * 1.2 if day >= 30 else 0
+        # Market contributions switch on by launch day
+        us_contribution = base * (t >= 0)  # US market (days 0+)
+        eu_contribution = base * 0.8 * (t >= 15)  # EU market (days 15+)
+        apac_contribution = base * 1.2 * (t >= 30)  # APAC market (days 30+)
 
-            total = us_contribution + eu_contribution + apac_contribution
+        total = us_contribution + eu_contribution + apac_contribution
 
-            # Add timezone stagger effect (24-hour cycle)
-            import math
-
-            timezone_factor = 1 + 0.3 * math.sin(2 * math.pi * day / 7)
-            pattern.append(total * timezone_factor)
+        # Add timezone stagger effect (24-hour cycle)
+        timezone_factor = 1 + 0.3 * np.sin(2 * np.pi * t / 7)
+        pattern = (total * timezone_factor).tolist()
 
         results = self.simulate_days(45, pattern, rule)
 
-        # Check growth phases
-        us_only = results[:15]
-        us_eu = results[15:30]
-        global_launch = results[30:45]
-
-        avg_us = sum(r.daily_spend_limit for r in us_only) / len(us_only)
-        avg_us_eu = sum(r.daily_spend_limit for r in us_eu) / len(us_eu)
-        avg_global = sum(r.daily_spend_limit for r in global_launch) / len(
-            global_launch
-        )
+        # Check growth phases: US only, US + EU, then global
+        limits = _column(results, "daily_spend_limit")
+        avg_us = limits[:15].mean()
+        avg_us_eu = limits[15:30].mean()
+        avg_global = limits[30:45].mean()
 
         # Each phase should have higher limits
         assert avg_us_eu > avg_us * 1.3  # EU launch effect
@@ -4,110 +4,104 @@ Comprehensive test suite for SGMEngine from sgm_simulator_v5.py
 Tests the core SGM algorithm and spend limit calculations
 """
 
+from dataclasses import fields
+
+import numpy as np
 import pytest
 
-from sgm_simulator import DayResult, ReservedVolumesConfig, SGMEngine, SGMRule
+from sgm_simulator import (
+    BatchedSimulator,
+    DayResult,
+    InterventionType,
+    ManualAllowance,
+    ReservedVolumesConfig,
+    SGMEngine,
+    SGMRule,
+    SGMState,
+    WalletConfig,
+    day_results_to_arrays,
+)
 
 
 class TestSGMEngine:
     """Test suite for SGMEngine core functionality"""
 
-    def test_bootstrap_initial_limit(self):
-        """Test initial daily limit calculation during bootstrap"""
-        rule = SGMRule(
-            name="Test Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
-
-        # Day 0 should give us min_growth / 7
-        limit, _, _ = SGMEngine.calculate_daily_spend_limit([], rule)
-        assert limit == pytest.approx(20.0 / 7, rel=1e-3)
-
-    def test_bootstrap_growth(self):
-        """Test that bootstrap allows growth based on spending"""
+    @pytest.mark.parametrize(
+        "history, growth_pct, min_growth, enabled, expected",
+        [
+            # Day 0 should give us min_growth / 7
+            pytest.param([], 20.0, 20.0, True, 20.0 / 7, id="bootstrap_initial_limit"),
+            # Day 0 spent exactly the limit; day 1 should allow 20% growth
+            pytest.param([2.86], 20.0, 20.0, True, 2.86 * 1.2, id="bootstrap_growth"),
+            # Only spent $3 in 3 days: need $17 in remaining 4 days = $4.25/day
+            pytest.param(
+                [1.0] * 3, 20.0, 20.0, True, 4.25, id="bootstrap_weekly_minimum"
+            ),
+            # PRFAQ after 7 days at $3/day: recent_7 = 21, recent_6 = 18
+            # exponential: 21 * 1.20^(1/7) - 18 ≈ 3.6, linear: 21 + 20/7 - 18 ≈ 5.86
+            pytest.param(
+                [3.0] * 7,
+                20.0,
+                20.0,
+                True,
+                max(21.0 * 1.20 ** (1.0 / 7) - 18.0, 21.0 + 20.0 / 7 - 18.0, 0),
+                id="prfaq_algorithm_start",
+            ),
+            # Steady $5/day: max of exponential and linear growth
+            pytest.param(
+                [5.0] * 7,
+                20.0,
+                20.0,
+                True,
+                max(35.0 * 1.20 ** (1.0 / 7) - 30.0, 35.0 + 20.0 / 7 - 30.0, 0),
+                id="prfaq_growth_calculation",
+            ),
+            # Zero-spend days still give limits based on the pattern:
+            # recent_7 = 20, recent_6 = 15
+            pytest.param(
+                [5.0, 0.0, 5.0, 0.0, 5.0, 0.0, 5.0],
+                20.0,
+                20.0,
+                True,
+                max(20.0 * 1.20 ** (1.0 / 7) - 15.0, 20.0 + 20.0 / 7 - 15.0, 0),
+                id="zero_spend_days",
+            ),
+            # With 50% weekly growth, daily limit should be significantly higher
+            pytest.param(
+                [10.0] * 7,
+                50.0,
+                20.0,
+                True,
+                max(70 * 1.50 ** (1.0 / 7) - 60, 70 + 20.0 / 7 - 60),
+                id="high_growth_percentage",
+            ),
+            # Even with a disabled rule the engine calculates limits
+            # (the simulator handles the disabled state)
+            pytest.param(
+                [5.0] * 7,
+                20.0,
+                20.0,
+                False,
+                max(35.0 * 1.20 ** (1.0 / 7) - 30.0, 35.0 + 20.0 / 7 - 30.0, 0),
+                id="disabled_rule",
+            ),
+        ],
+    )
+    def test_limit_cases(self, history, growth_pct, min_growth, enabled, expected):
+        """Test daily limits for bootstrap and PRFAQ histories"""
         rule = SGMRule(
             name="Test Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
-
-        # Simulate first few days with increasing spending
-        history = [2.86]  # Day 0 spent exactly the limit
-        limit_day1, _, _ = SGMEngine.calculate_daily_spend_limit(history, rule)
-
-        # Day 1 should allow 20% growth
-        expected = 2.86 * 1.2
-        assert limit_day1 >= expected
-
-    def test_bootstrap_weekly_minimum(self):
-        """Test that bootstrap ensures weekly minimum is achievable"""
-        rule = SGMRule(
-            name="Test Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
-
-        # If we've spent less than needed, limit should increase
-        history = [1.0, 1.0, 1.0]  # Only spent $3 in 3 days
-        limit, _, _ = SGMEngine.calculate_daily_spend_limit(history, rule)
-
-        # Need to spend at least $17 in remaining 4 days = $4.25/day
-        assert limit >= 4.25
-
-    def test_prfaq_algorithm_start(self):
-        """Test PRFAQ algorithm activation after 7 days"""
-        rule = SGMRule(
-            name="Test Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
+            growth_percentage=growth_pct,
+            min_growth_dollars=min_growth,
+            enabled=enabled,
         )
 
-        # 7 days of history at $3/day
-        history = [3.0] * 7
         limit, _, _ = SGMEngine.calculate_daily_spend_limit(history, rule)
-
-        # PRFAQ should calculate based on recent history
-        # recent_7 = 21, recent_6 = 18
-        # exponential: 21 * 1.20^(1/7) - 18 ≈ 3.6
-        # linear: 21 + 20/7 - 18 ≈ 5.86
-        assert limit > 3.0  # Should be higher than historical average
-
-    def test_prfaq_growth_calculation(self):
-        """Test PRFAQ growth calculations"""
-        rule = SGMRule(
-            name="Test Rule",
-            growth_percentage=20.0,  # 20% per week
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
-
-        # Steady spending at $5/day for 7 days
-        history = [5.0] * 7
-        limit, _, _ = SGMEngine.calculate_daily_spend_limit(history, rule)
-
-        # Should choose max of exponential and linear growth
-        recent_7 = 35.0
-        recent_6 = 30.0
-        growth_factor = 1.20 ** (1.0 / 7)  # Daily growth for 20% weekly
-        exponential = recent_7 * growth_factor - recent_6
-        linear = recent_7 + 20.0 / 7 - recent_6
-
-        expected = max(exponential, linear, 0)
         assert limit == pytest.approx(expected, rel=1e-3)
 
-    def test_wallet_cap_enforcement(self):
+    def test_wallet_cap_enforcement(self, default_rule):
         """Test that wallet is capped at 2x daily limit"""
-        rule = SGMRule(
-            name="Test Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rule = default_rule
 
         # Simulate day with high wallet balance
         result, _, _ = SGMEngine.simulate_day(
@@ -125,18 +119,11 @@ class TestSGMEngine:
         # Wallet should be capped at 2x daily limit
         assert result.wallet_balance_start <= result.daily_spend_limit * 2
 
-    def test_reserved_volume_consumption(self):
+    def test_reserved_volume_consumption(self, default_rule, default_reserved):
         """Test that reserved volumes are consumed before SGM"""
-        rule = SGMRule(
-            name="Test Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rule = default_rule
 
-        reserved = ReservedVolumesConfig(
-            monthly_volume=100.0, billing_day_start=1, days_in_cycle=30
-        )
+        reserved = default_reserved
 
         result, _, _ = SGMEngine.simulate_day(
             day_index=0,
@@ -155,18 +142,11 @@ class TestSGMEngine:
         assert result.sgm_spend == 0.0
         assert result.accepted_spend == 10.0
 
-    def test_reserved_to_sgm_transition(self):
+    def test_reserved_to_sgm_transition(self, default_rule, default_reserved):
         """Test smooth transition when reserved volume is exhausted"""
-        rule = SGMRule(
-            name="Test Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rule = default_rule
 
-        reserved = ReservedVolumesConfig(
-            monthly_volume=100.0, billing_day_start=1, days_in_cycle=30
-        )
+        reserved = default_reserved
 
         # Simulate with 95 already used, requesting 10
         result, _, _ = SGMEngine.simulate_day(
@@ -186,14 +166,9 @@ class TestSGMEngine:
         assert result.sgm_spend > 0
         assert result.accepted_spend == result.reserved_spend + result.sgm_spend
 
-    def test_intervention_types(self):
+    def test_intervention_types(self, default_rule):
         """Test intervention type detection"""
-        rule = SGMRule(
-            name="Test Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rule = default_rule
 
         # Test throttle intervention (partial rejection)
         result, _, _ = SGMEngine.simulate_day(
@@ -230,14 +205,9 @@ class TestSGMEngine:
         if result2.sgm_spend < 10.0:  # If we accepted less than 10% of SGM request
             assert result2.intervention_type == "shutdown"
 
-    def test_manual_allowance(self):
+    def test_manual_allowance(self, default_rule):
         """Test manual allowance addition to wallet"""
-        rule = SGMRule(
-            name="Test Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rule = default_rule
 
         # Test with manual allowance
         result, _, _ = SGMEngine.simulate_day(
@@ -255,18 +225,11 @@ class TestSGMEngine:
         # Should be able to spend the requested amount with manual allowance
         assert result.accepted_spend == 10.0
 
-    def test_billing_cycle_reset(self):
+    def test_billing_cycle_reset(self, default_rule, default_reserved):
         """Test that reserved volume resets on new billing cycle"""
-        rule = SGMRule(
-            name="Test Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=True,
-        )
+        rule = default_rule
 
-        reserved = ReservedVolumesConfig(
-            monthly_volume=100.0, billing_day_start=1, days_in_cycle=30
-        )
+        reserved = default_reserved
 
         # Simulate billing day 1 with previous usage
         result, _, _ = SGMEngine.simulate_day(
@@ -285,56 +248,356 @@ class TestSGMEngine:
         assert result.reserved_spend == 50.0
         assert result.cumulative_reserved_used == 50.0
 
-    def test_zero_spend_days(self):
-        """Test handling of days with zero spending"""
+    def test_rolling_limits_match_prefix_calls(self, default_rule):
+        """Test window-sum limits agree with calculate_daily_spend_limit on prefixes"""
+        rule = default_rule
+        history = [3.0, 7.5, 12.0, 4.25, 9.0, 15.0, 6.0, 8.0, 11.0, 13.5, 2.0]
+
+        limits = SGMEngine.calculate_rolling_limits(history, rule, range(12))
+
+        for day in range(12):
+            expected, _, _ = SGMEngine.calculate_daily_spend_limit(
+                history[:day], rule, day, 0
+            )
+            assert limits[day] == pytest.approx(expected)
+
+    def test_simulate_day_scenarios_matches_simulate_day(self, default_rule):
+        """Test scenario-axis simulation reproduces independent simulate_day calls"""
+        rule = default_rule
+        reserved = ReservedVolumesConfig(
+            monthly_volume=30.0, billing_day_start=1, days_in_cycle=30
+        )
+        history = [10.0, 12.0, 9.0, 15.0, 11.0, 10.0, 13.0]
+        scenarios = [
+            (50.0, 100.0, []),
+            (10.0, 50.0, [ManualAllowance(amount=100.0, created_day=0)]),
+            (30.0, 25.0, [ManualAllowance(amount=75.0, created_day=0)]),
+            (0.0, 0.0, []),
+            (
+                5.0,
+                60.0,
+                [ManualAllowance(amount=20.0, created_day=0, expiration_days=3)],
+            ),
+        ]
+        wallets, requests, allowances = zip(*scenarios)
+
+        arrs = SGMEngine.simulate_day_scenarios(
+            day_index=7,
+            billing_day=8,
+            requested_spend=requests,
+            wallet_balance=wallets,
+            accepted_history=history,
+            rule=rule,
+            reserved_config=reserved,
+            cumulative_reserved_used=20.0,
+            manual_allowances=list(allowances),
+        )
+
+        expected = day_results_to_arrays(
+            [
+                SGMEngine.simulate_day(
+                    day_index=7,
+                    billing_day=8,
+                    requested_spend=request,
+                    wallet_balance=wallet,
+                    accepted_history=history,
+                    rule=rule,
+                    reserved_config=reserved,
+                    cumulative_reserved_used=20.0,
+                    manual_allowances=day_allowances,
+                )[0]
+                for wallet, request, day_allowances in scenarios
+            ]
+        )
+
+        assert arrs.keys() == expected.keys()
+        for name, column in expected.items():
+            assert list(arrs[name]) == list(column), name
+
+    def test_simulate_days_batch_matches_simulate_range(self):
+        """Test randomized batch runs match simulate_range bit for bit"""
+        rng = np.random.default_rng(11)
+        for trial in range(40):
+            rule = SGMRule(
+                name="Random Rule",
+                growth_percentage=float(rng.uniform(5.0, 50.0)),
+                min_growth_dollars=float(rng.uniform(20.0, 100.0)),
+                enabled=True,
+                weekly_recalc_enabled=bool(trial % 2),
+                weekly_recalc_day=int(rng.integers(7)),
+            )
+            wallet_config = WalletConfig(
+                model=("daily_limit_2x", "three_day_budget")[trial % 3 == 0]
+            )
+            reserved = None
+            if trial % 4 < 2:
+                reserved = ReservedVolumesConfig(
+                    monthly_volume=float(rng.uniform(0.0, 300.0)),
+                    billing_day_start=int(rng.integers(1, 31)),
+                )
+            allowances = []
+            if trial % 5 < 2:
+                allowances = [
+                    ManualAllowance(
+                        amount=float(rng.uniform(0.0, 100.0)),
+                        created_day=int(rng.integers(60)),
+                        expiration_days=int(rng.integers(1, 10)),
+                    ),
+                    ManualAllowance(amount=25.0, created_day=int(rng.integers(60))),
+                ]
+            requests = rng.uniform(0.0, 200.0, (3, 60)).round(2)
+            daily_allowances = np.where(
+                rng.random(60) < 0.1, rng.uniform(-20.0, 80.0, 60), 0.0
+            )
+
+            batch = SGMEngine.simulate_days_batch(
+                requests,
+                rule,
+                wallet_config,
+                reserved,
+                manual_allowances=[allowances] * 3,
+                daily_allowances=daily_allowances,
+            )
+
+            for row, row_requests in enumerate(requests):
+                expected = SGMEngine.simulate_range(
+                    row_requests,
+                    rule,
+                    wallet_config,
+                    reserved,
+                    allowances,
+                    daily_allowances,
+                )
+                assert batch.keys() == expected.keys()
+                for name, column in expected.items():
+                    assert batch[name][row].tolist() == column.tolist(), (trial, name)
+
+    def test_day_results_to_arrays(self, default_rule):
+        """Test columnar conversion matches per-day values"""
+        rule = default_rule
+
+        days = []
+        history = []
+        wallet = 0.0
+        for day in range(10):
+            result, _, _ = SGMEngine.simulate_day(
+                day_index=day,
+                billing_day=day + 1,
+                requested_spend=5.0 + day,
+                wallet_balance=wallet,
+                accepted_history=history,
+                rule=rule,
+            )
+            days.append(result)
+            history.append(result.accepted_spend)
+            wallet = result.wallet_balance_end
+
+        arrs = day_results_to_arrays(days)
+
+        assert len(arrs["day_index"]) == 10
+        assert arrs["requested_spend"][:7].sum() == pytest.approx(
+            sum(d.requested_spend for d in days[:7])
+        )
+        assert list(arrs["accepted_spend"]) == history
+        assert list(arrs["intervention_type"]) == [d.intervention_type for d in days]
+
+    def test_simulate_range_matches_simulate_day(self):
+        """Test batched simulation reproduces the simulate_day loop"""
         rule = SGMRule(
             name="Test Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
+            growth_percentage=25.0,
+            min_growth_dollars=30.0,
             enabled=True,
+            weekly_recalc_enabled=True,
+            weekly_recalc_day=0,
+        )
+        wallet_config = WalletConfig(model="three_day_budget")
+        reserved = ReservedVolumesConfig(
+            monthly_volume=200.0, billing_day_start=25, days_in_cycle=30
+        )
+        allowances = [
+            ManualAllowance(amount=100.0, created_day=5, expiration_days=10),
+            ManualAllowance(amount=50.0, created_day=0),
+        ]
+        requests = [20.0, 25.0, 30.0, 15.0, 40.0] * 8
+
+        days = []
+        history = []
+        wallet = 0.0
+        billing_day = reserved.billing_day_start
+        cumulative_reserved = 0.0
+        last_recalc_day = 0
+        baseline_spend = None
+        for day_index, request in enumerate(requests):
+            result, last_recalc_day, baseline_spend = SGMEngine.simulate_day(
+                day_index=day_index,
+                billing_day=billing_day,
+                requested_spend=request,
+                wallet_balance=wallet,
+                accepted_history=history,
+                rule=rule,
+                wallet_config=wallet_config,
+                reserved_config=reserved,
+                cumulative_reserved_used=cumulative_reserved,
+                manual_allowances=allowances,
+                last_recalc_day=last_recalc_day,
+                baseline_spend=baseline_spend,
+            )
+            days.append(result)
+            history.append(result.accepted_spend)
+            wallet = result.wallet_balance_end
+            cumulative_reserved = result.cumulative_reserved_used
+            billing_day = reserved.advance_billing_day(billing_day)
+            if billing_day == 1:
+                cumulative_reserved = 0.0
+
+        expected = day_results_to_arrays(days)
+        arrs = SGMEngine.simulate_range(
+            requests,
+            rule,
+            wallet_config=wallet_config,
+            reserved_config=reserved,
+            manual_allowances=allowances,
         )
 
-        # History with some zero-spend days
-        history = [5.0, 0.0, 5.0, 0.0, 5.0, 0.0, 5.0]
-        limit, _, _ = SGMEngine.calculate_daily_spend_limit(history, rule)
-
-        # Should still calculate limits based on the pattern
-        assert limit > 0
+        # Window sums come from a running total, so allow float rounding
+        assert arrs.keys() == expected.keys()
+        assert list(arrs["intervention_type"]) == list(expected["intervention_type"])
+        for name, column in expected.items():
+            if name != "intervention_type":
+                assert list(arrs[name]) == pytest.approx(list(column)), name
 
-    def test_high_growth_percentage(self):
-        """Test with high growth percentage (50% per week)"""
+    def test_sgm_state_matches_simulate_day(self):
+        """Test SGMState rolling sums reproduce the simulate_day loop"""
+        rule = SGMRule(
+            name="Test Rule",
+            growth_percentage=25.0,
+            min_growth_dollars=30.0,
+            enabled=True,
+            weekly_recalc_enabled=True,
+            weekly_recalc_day=0,
+        )
+        wallet_config = WalletConfig(model="three_day_budget")
+        reserved = ReservedVolumesConfig(
+            monthly_volume=200.0, billing_day_start=25, days_in_cycle=30
+        )
+        allowances = [ManualAllowance(amount=100.0, created_day=5, expiration_days=10)]
+        requests = [20.0, 25.0, 30.0, 15.0, 40.0] * 8
+        same_day = [0.0] * 12 + [60.0] + [0.0] * 27
+
+        state = SGMState(rule, wallet_config, reserved, allowances)
+        history = []
+        wallet = 0.0
+        billing_day = reserved.billing_day_start
+        cumulative_reserved = 0.0
+        last_recalc_day = 0
+        baseline_spend = None
+        for day_index, request in enumerate(requests):
+            expected, last_recalc_day, baseline_spend = SGMEngine.simulate_day(
+                day_index=day_index,
+                billing_day=billing_day,
+                requested_spend=request,
+                wallet_balance=wallet,
+                accepted_history=history,
+                rule=rule,
+                wallet_config=wallet_config,
+                reserved_config=reserved,
+                cumulative_reserved_used=cumulative_reserved,
+                manual_allowances=allowances,
+                last_recalc_day=last_recalc_day,
+                baseline_spend=baseline_spend,
+                manual_allowance=same_day[day_index],
+            )
+            result = state.advance(request, billing_day, same_day[day_index])
+
+            # SGMState takes window sums as differences of compensated prefix sums while
+            # simulate_day sums the slices directly, so the last bits can differ
+            assert result.intervention_type == expected.intervention_type
+            for f in fields(DayResult):
+                if f.name != "intervention_type":
+                    assert getattr(result, f.name) == pytest.approx(
+                        getattr(expected, f.name)
+                    ), (day_index, f.name)
+
+            history.append(expected.accepted_spend)
+            wallet = expected.wallet_balance_end
+            cumulative_reserved = expected.cumulative_reserved_used
+            billing_day = reserved.advance_billing_day(billing_day)
+
+        assert list(state.accepted_history) == pytest.approx(history)
+        assert state.sum_last_7 == pytest.approx(sum(history[-7:]))
+        assert state.sum_last_6 == pytest.approx(sum(history[-6:]))
+
+    def test_sgm_state_matches_simulate_range_long_run(self):
+        """Test SGMState window sums stay bit-identical to simulate_range"""
         rule = SGMRule(
-            name="High Growth",
-            growth_percentage=50.0,
+            name="Test Rule",
+            growth_percentage=20.0,
             min_growth_dollars=20.0,
             enabled=True,
+            weekly_recalc_enabled=True,
         )
+        allowances = [ManualAllowance(amount=75.0, created_day=40, expiration_days=5)]
+        rng = np.random.default_rng(7)
+        requests = rng.uniform(0.01, 500.0, 1500).round(2)
 
-        history = [10.0] * 7
-        limit, _, _ = SGMEngine.calculate_daily_spend_limit(history, rule)
+        arrs = SGMEngine.simulate_range(requests, rule, manual_allowances=allowances)
+        state = SGMState(rule, manual_allowances=allowances)
+        accepted = [state.advance(request, 1).accepted_spend for request in requests]
 
-        # With 50% weekly growth, daily limit should be significantly higher
-        growth_factor = 1.50 ** (1.0 / 7)
-        expected_exponential = 70 * growth_factor - 60
-        expected_linear = 70 + 20.0 / 7 - 60
+        assert accepted == list(arrs["accepted_spend"])
 
-        assert limit == pytest.approx(
-            max(expected_exponential, expected_linear), rel=1e-3
-        )
+    def test_simulate_range_daily_allowances(self, default_rule):
+        """Test per-day allowances match simulate_day's legacy manual_allowance"""
+        rule = default_rule
+        requests = [10.0] * 10 + [80.0, 80.0]
+        daily_allowances = [0.0] * 10 + [50.0, -30.0]
 
-    def test_disabled_rule(self):
-        """Test behavior when SGM rule is disabled"""
-        rule = SGMRule(
-            name="Disabled Rule",
-            growth_percentage=20.0,
-            min_growth_dollars=20.0,
-            enabled=False,
+        arrs = SGMEngine.simulate_range(
+            requests, rule, daily_allowances=daily_allowances
         )
 
-        # Even with disabled rule, engine should calculate limits
-        # (The simulator would handle the disabled state)
-        limit, _, _ = SGMEngine.calculate_daily_spend_limit([5.0] * 7, rule)
-        assert limit > 0
+        history = []
+        wallet = 0.0
+        for day_index, request in enumerate(requests):
+            result, _, _ = SGMEngine.simulate_day(
+                day_index=day_index,
+                billing_day=1,
+                requested_spend=request,
+                wallet_balance=wallet,
+                accepted_history=history,
+                rule=rule,
+                manual_allowance=daily_allowances[day_index],
+            )
+            history.append(result.accepted_spend)
+            wallet = result.wallet_balance_end
+
+            assert arrs["accepted_spend"][day_index] == pytest.approx(
+                result.accepted_spend
+            )
+            assert arrs["manual_allowances_used"][day_index] == pytest.approx(
+                result.manual_allowances_used
+            )
+
+        # The allowance only applies on the day it was given, and negative
+        # amounts are ignored as they are by simulate_day
+        assert arrs["manual_allowances_used"][10] > 0
+        assert arrs["manual_allowances_used"][11] == 0
+        state = SGMState(rule)
+        for request, allowance in zip(requests, daily_allowances):
+            result = state.advance(request, 1, allowance)
+        assert result.accepted_spend == pytest.approx(arrs["accepted_spend"][-1])
+
+    def test_batched_intervention_codes(self, default_rule):
+        """Test BatchedSimulator records InterventionType codes for each label"""
+        rule = default_rule
+        sim = BatchedSimulator(rule)
+        labels = sim.run([10.0] * 8 + [15.0, 1000.0])["intervention_type"]
+
+        assert [InterventionType(c).label for c in sim.intervention_codes] == list(
+            labels
+        )
+        assert sim.intervention_codes[-1] == InterventionType.SHUTDOWN
 
 
 if __name__ == "__main__":
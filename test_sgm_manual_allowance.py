@@ -4,6 +4,7 @@ Comprehensive tests for manual allowance functionality
 Tests all aspects of manual allowance behavior and interactions
 """
 
+import numpy as np
 import pytest
 
 from sgm_simulator import ReservedVolumesConfig, SGMEngine, SGMRule
@@ -322,37 +323,21 @@ class TestSGMManualAllowance:
         )
 
         # Simulate sequence with varying manual allowances
-        accepted_history = []
-        wallet_balance = 0.0
         manual_allowances = [0.0, 10.0, 20.0, 0.0, 50.0, 0.0, 0.0]
         requests = [15.0] * 7
 
-        results = []
-        for day in range(7):
-            result, _, _ = SGMEngine.simulate_day(
-                day_index=day,
-                billing_day=day + 1,
-                requested_spend=requests[day],
-                wallet_balance=wallet_balance,
-                accepted_history=accepted_history,
-                rule=rule,
-                reserved_config=None,
-                cumulative_reserved_used=0,
-                manual_allowance=manual_allowances[day],
-            )
-
-            accepted_history.append(result.accepted_spend)
-            wallet_balance = result.wallet_balance_end
-            results.append(result)
+        results = SGMEngine.simulate_days_batch(
+            requests,
+            rule,
+            daily_allowances=manual_allowances,
+            billing_day=np.arange(1, 8),
+        )
+        accepted = results["accepted_spend"]
 
         # Days with manual allowance should have higher acceptance
-        day_1_no_manual = results[0]
-        day_2_with_manual = results[1]
-        day_5_large_manual = results[4]
-
-        assert day_2_with_manual.accepted_spend >= day_1_no_manual.accepted_spend
-        assert day_5_large_manual.accepted_spend == 15.0  # Full acceptance
-        assert day_5_large_manual.rejected_spend == 0.0
+        assert accepted[1] >= accepted[0]
+        assert accepted[4] == 15.0  # Full acceptance
+        assert results["rejected_spend"][4] == 0.0
 
     def test_manual_allowance_wallet_interaction(self):
         """Test how manual allowance affects wallet balance"""
@@ -4,6 +4,8 @@ Test suite for SGM rule validation
 Tests that validation works correctly when enabled
 """
 
+import dataclasses
+
 import pytest
 
 from sgm_simulator import SGMRule
@@ -130,6 +132,18 @@ class TestSGMRuleValidation:
         with pytest.raises(ValueError):
             SGMRule("Above UI", ui_max + 0.1, 20.0, True)
 
+    def test_rules_are_frozen_and_hashable(self):
+        """Test that rules are immutable values usable as cache keys"""
+        rule = SGMRule("Test Rule", 20.0, 20.0, True)
+        same = SGMRule("Test Rule", 20.0, 20.0, True)
+
+        assert rule == same
+        assert hash(rule) == hash(same)
+        assert rule.daily_growth_factor == pytest.approx(1.2 ** (1.0 / 7))
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            rule.growth_percentage = 30.0
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])